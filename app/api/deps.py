@@ -1,15 +1,186 @@
-from collections.abc import Generator
-from typing import Annotated
+import functools
+import inspect
+from collections.abc import AsyncGenerator, Callable, Generator, Iterable
+from typing import Annotated, Any, Optional
+from urllib.parse import quote
 
-from fastapi import Depends
+from fastapi import Depends, Query, Request, Response, status
+from sqlalchemy import inspect as sa_inspect
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.db import engine
+from app.core.config import settings
+from app.core.db import async_engine, async_engine_waits, engine, engine_waits
+from app.core.exceptions import ConditionError
 
 
 def get_db() -> Generator[Session, None, None]:
     with Session(engine) as session:
+        # check out the connection upfront to measure the wait for the pool
+        start = engine_waits.start()
+        session.connection()
+        engine_waits.stop(start)
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_db)]
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        start = async_engine_waits.start()
+        await session.connection()
+        async_engine_waits.stop(start)
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+def run_in_async_session(endpoint: Callable) -> Callable:
+    """Async version of a sync route taking a `session: SessionDep`.
+
+    The route body, crud calls and lazy loads included, runs through
+    `AsyncSession.run_sync`: its queries await the async driver on the event
+    loop rather than holding a threadpool thread for the whole request.
+    FastAPI validates the result against the response model, once, unless it
+    holds ORM rows: those are validated in the same greenlet, as rendering
+    them may lazy load relationships.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        return endpoint
+    signature = inspect.signature(endpoint)
+    parameters = [
+        parameter.replace(annotation=AsyncSessionDep)
+        if parameter.name == "session"
+        else parameter
+        for parameter in signature.parameters.values()
+    ]
+    # FastAPI injects the request into a single parameter, the route's own if any
+    request_name = next(
+        (parameter.name for parameter in parameters if parameter.annotation is Request),
+        None,
+    )
+    if request_name is None:
+        request_name = "async_route_request"
+        parameters.append(
+            inspect.Parameter(
+                request_name, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            )
+        )
+
+    @functools.wraps(endpoint)
+    async def async_endpoint(session: AsyncSession, **kwargs):
+        request = kwargs[request_name]
+        if request_name == "async_route_request":
+            del kwargs[request_name]
+
+        def render(sync_session: Session):
+            content = endpoint(session=sync_session, **kwargs)
+            field = request.scope["route"].response_field
+            if field is None or not _holds_rows(content):
+                return content
+            value, errors = field.validate(content, {}, loc=("response",))
+            # leave reporting validation errors to FastAPI
+            return content if errors else value
+
+        return await session.run_sync(render)
+
+    async_endpoint.__signature__ = signature.replace(  # type: ignore[attr-defined]
+        parameters=parameters
+    )
+    return async_endpoint
+
+
+def _holds_rows(content: Any) -> bool:
+    """Whether `content`, or an item of it, is a row mapped by the ORM."""
+    items = content if isinstance(content, list) else [content]
+    return any(sa_inspect(item, raiseerr=False) is not None for item in items)
+
+
+def async_session_route(endpoint: Callable) -> Callable:
+    """Serve the route with `run_in_async_session` if DATABASE_ASYNC is set."""
+    if settings.DATABASE_ASYNC:
+        return run_in_async_session(endpoint)
+    return endpoint
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+CursorQuery = Query(
+    default=None,
+    description="Opt into keyset pagination: pass an empty value for the first "
+    f"page, then the `{NEXT_CURSOR_HEADER}` header of the previous page. "
+    "`skip` is ignored in this mode.",
+)
+
+
+FieldsQuery = Query(
+    default=None,
+    description="Comma-separated fields to return, all of them by default.",
+)
+
+EmbedQuery = Query(
+    default=None,
+    description="Comma-separated relationships to embed, all of them by default. "
+    "Pass an empty value to embed none.",
+)
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    """Expose the cursor of the next page, if any, in the response headers."""
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+MISSING_IDS_HEADER = "X-Missing-IDs"
+
+# items fetched by a multi-get at most
+MAX_MULTI_GET = 100
+
+
+def comma_separated(
+    value: Optional[str], name: str, cast: Callable[[str], Any] = str
+) -> Optional[list]:
+    """Items of a comma-separated query parameter of a multi-get, None if the
+    parameter is absent."""
+    if value is None:
+        return None
+    try:
+        items = [cast(item.strip()) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise ConditionError(
+            condition=f"Invalid {name}", status_code=status.HTTP_400_BAD_REQUEST
+        )
+    if len(items) > MAX_MULTI_GET:
+        raise ConditionError(
+            condition=f"Too many {name}",
+            detail=f"At most {MAX_MULTI_GET} {name} per request",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    return items
+
+
+def reject_page_parameters(
+    request: Request, name: str, parameters: Iterable[str]
+) -> None:
+    """Refuse a multi-get by `name` combined with any of the `parameters` that
+    select a page of the list, which it replaces."""
+    conflicting = [
+        parameter for parameter in parameters if parameter in request.query_params
+    ]
+    if conflicting:
+        raise ConditionError(
+            condition="Conflicting parameters",
+            detail=f"{name} cannot be combined with {', '.join(conflicting)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+def set_missing_ids(response: Response, missing: list) -> None:
+    """Report the items of a multi-get that were not found, percent-encoded as
+    they come from the client and headers only carry latin-1."""
+    if missing:
+        response.headers[MISSING_IDS_HEADER] = ",".join(
+            quote(str(item), safe="") for item in missing
+        )
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def conditional_response(
+    request: Request, response: Response, version: str
+) -> Optional[Response]:
+    """Tag the response with a strong ETag derived from the version of the
+    rendered rows and the requested URL.
+
+    Returns a 304 response to send instead if the client already holds this
+    representation (If-None-Match), None otherwise.
+    """
+    representation = f"{version}:{request.url.path}?{request.url.query}"
+    etag = f'"{hashlib.md5(representation.encode()).hexdigest()}"'
+    if if_none_match(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+    response.headers["ETag"] = etag
+    return None
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the If-None-Match header of `request` matches `etag`, comparing
+    weakly as GET requests do, or is `*`."""
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates or "*" in candidates
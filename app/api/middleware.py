@@ -0,0 +1,72 @@
+from typing import NamedTuple
+
+from fastapi import Request, Response, status
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.api.etag import if_none_match
+from app.core.cache import ResponseCache
+
+# headers replayed along with a cached body
+CACHED_HEADERS = (
+    "content-type",
+    "etag",
+    "x-next-cursor",
+    "x-missing-ids",
+    "cache-control",
+)
+
+
+class CachedResponse(NamedTuple):
+    content: bytes
+    headers: dict[str, str]
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serve GET requests on the given namespaces (first segment of the path)
+    from `cache`, keyed by path and query string. Successful responses are
+    stored on the way out; crud write functions invalidate the namespaces
+    whose responses they affect."""
+
+    def __init__(self, app, cache: ResponseCache, namespaces: set[str]) -> None:
+        super().__init__(app)
+        self.cache = cache
+        self.namespaces = namespaces
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        namespace = request.url.path.strip("/").split("/")[0]
+        if request.method != "GET" or namespace not in self.namespaces:
+            return await call_next(request)
+
+        key = f"{request.url.path}?{request.url.query}"
+        cached = self.cache.get(namespace, key)
+        if cached is not None:
+            etag = cached.headers.get("etag")
+            if etag is not None and if_none_match(request, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+                )
+            return Response(content=cached.content, headers=cached.headers)
+
+        generation = self.cache.generation(namespace)
+        response = await call_next(request)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        content = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name in CACHED_HEADERS
+        }
+        self.cache.set(
+            namespace, key, CachedResponse(content, headers), generation=generation
+        )
+        replayed = Response(content=content, status_code=response.status_code)
+        # raw headers keep repeated ones, such as Vary or Set-Cookie
+        replayed.raw_headers = [
+            (name, value)
+            for name, value in response.raw_headers
+            if name != b"content-length"
+        ] + [(b"content-length", str(len(content)).encode())]
+        return replayed
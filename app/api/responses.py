@@ -0,0 +1,81 @@
+from typing import Any, Optional
+
+from fastapi import Response, status
+from pydantic_core import to_json
+from sqlmodel import SQLModel
+
+from app.core.exceptions import ConditionError
+
+
+class PydanticJSONResponse(Response):
+    """JSON response of pydantic models, or lists of models, that the route
+    has already validated.
+
+    The content is rendered straight to bytes by pydantic-core. Returned as a
+    `Response`, it skips FastAPI's second validation against the response
+    model and its `jsonable_encoder` pass.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, include: Any = None, **kwargs: Any) -> None:
+        self.include = include
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, include=self.include)
+
+
+def model_response(
+    response: Response, content: Any, include: Optional[set[str]] = None
+) -> PydanticJSONResponse:
+    """Send `content` with the status code and headers set on `response`, the
+    response parameter of the route, as FastAPI would have. Only the
+    `include` fields of the models are rendered, if given."""
+    if include is not None and isinstance(content, list):
+        include = {"__all__": include}
+    return PydanticJSONResponse(
+        content,
+        include=include,
+        status_code=response.status_code or 200,
+        headers=response.headers,
+    )
+
+
+def _parse_names(value: str, allowed: set[str], what: str) -> set[str]:
+    names = {name.strip() for name in value.split(",")} - {""}
+    unknown = names - allowed
+    if unknown:
+        raise ConditionError(
+            condition=f"Unknown {what}",
+            detail=f"Unknown {what}: {', '.join(sorted(unknown))}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    return names
+
+
+def sparse_fieldset(
+    model: type[SQLModel],
+    relationships: frozenset[str],
+    fields: Optional[str],
+    embed: Optional[str],
+) -> tuple[frozenset[str], Optional[set[str]]]:
+    """Parse the `fields` and `embed` query parameters of a route rendering
+    `model`, whose `relationships` are embedded by default.
+
+    Returns the relationships to load and render, and the fields to render,
+    None for all of them. A relationship is embedded only if it is both among
+    the fields and the embeds requested.
+    """
+    embedded = relationships
+    include = None
+    if fields is not None:
+        include = _parse_names(fields, set(model.model_fields), "fields") | {"id"}
+        embedded = embedded & include
+    if embed is not None:
+        embedded = embedded & _parse_names(embed, set(relationships), "embeds")
+    if include is None and embedded != relationships:
+        include = set(model.model_fields)
+    if include is not None:
+        include -= relationships - embedded
+    return embedded, include
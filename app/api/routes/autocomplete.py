@@ -0,0 +1,28 @@
+from typing import Literal
+
+from fastapi import APIRouter, Query, Response
+
+from app import crud
+from app.api.deps import SessionDep, async_session_route
+from app.models import AutocompleteItem
+
+router = APIRouter()
+
+
+@router.get("/autocomplete", response_model=list[AutocompleteItem])
+@async_session_route
+def autocomplete(
+    session: SessionDep,
+    response: Response,
+    q: str = Query(min_length=1),
+    kind: Literal["contributor", "tag"] = "contributor",
+    limit: int = Query(default=10, ge=1, le=50),
+):
+    if kind == "tag":
+        suggestions = crud.select_tag_suggestions(session=session, query=q, limit=limit)
+    else:
+        suggestions = crud.select_contributor_suggestions(
+            session=session, query=q, limit=limit
+        )
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return [AutocompleteItem(id=id, label=label) for id, label in suggestions]
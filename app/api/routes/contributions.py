@@ -1,12 +1,32 @@
-from fastapi import APIRouter
-from sqlalchemy.sql import select
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query, Request, Response
+from sqlmodel import Session, select
 
 from app import crud
-from app.api.deps import SessionDep
+from app.api.deps import (
+    MISSING_IDS_HEADER,
+    CursorQuery,
+    EmbedQuery,
+    FieldsQuery,
+    SessionDep,
+    async_session_route,
+    comma_separated,
+    reject_page_parameters,
+    set_missing_ids,
+    set_next_cursor,
+)
+from app.api.etag import conditional_response
+from app.api.responses import model_response, sparse_fieldset
 from app.core.exceptions import NotFoundError
 from app.models import (
     Contribution,
+    ContributionBulkItem,
+    ContributionBulkResult,
     ContributionCreate,
+    ContributionNode,
+    ContributionSearchResult,
     ContributionShort,
     ContributionUpdate,
     ContributionWithAttributesShortPublic,
@@ -15,8 +35,22 @@ from app.models import (
 
 router = APIRouter()
 
+# parameters of GET /contributions that select a page, which `ids` replaces
+_PAGE_PARAMETERS = (
+    "skip",
+    "limit",
+    "cursor",
+    "tag",
+    "contributor",
+    "date_from",
+    "date_to",
+    "archived",
+    "sort",
+)
+
 
 @router.post("/contributions", response_model=ContributionWithAttributesShortPublic)
+@async_session_route
 def create_contribution(session: SessionDep, contribution: ContributionCreate):
     db_contribution, contributors = crud.create_contribution(
         session=session, contribution=contribution
@@ -26,18 +60,69 @@ def create_contribution(session: SessionDep, contribution: ContributionCreate):
     )
 
 
+@router.post("/contributions/bulk", response_model=list[ContributionBulkResult])
+@async_session_route
+def create_contributions_bulk(
+    session: SessionDep, contributions: list[ContributionBulkItem]
+):
+    return crud.create_contributions_bulk(session=session, items=contributions)
+
+
+@router.get(
+    "/contributions/search",
+    response_model=list[ContributionSearchResult],
+)
+@async_session_route
+def search_contributions(
+    session: SessionDep,
+    q: str = Query(min_length=1),
+    skip: int = 0,
+    limit: int = 20,
+):
+    results = crud.search_contributions(
+        session=session, query=q, skip=skip, limit=limit
+    )
+    return [
+        ContributionSearchResult.from_search_result(session, *result)
+        for result in results
+    ]
+
+
 @router.get(
     "/contributions/{contribution_id}",
     response_model=ContributionWithAttributesShortPublic,
 )
-def read_contribution(session: SessionDep, contribution_id: str):
+@async_session_route
+def read_contribution(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    contribution_id: str,
+    fields: Optional[str] = FieldsQuery,
+    embed: Optional[str] = EmbedQuery,
+):
+    embed_set, include = sparse_fieldset(
+        ContributionWithAttributesShortPublic, crud.CONTRIBUTION_EMBEDS, fields, embed
+    )
+    version = crud.select_contributions_version(
+        session=session, contribution_ids=[contribution_id]
+    )
+    if version is None:
+        raise NotFoundError(what="Contribution")
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
     contribution = crud.select_contribution_by_id(
         session=session, contribution_id=contribution_id
     )
     if contribution is None:
         raise NotFoundError(what="Contribution")
-    return ContributionWithAttributesShortPublic.from_contribution(
-        session, contribution
+    return model_response(
+        response,
+        ContributionWithAttributesShortPublic.from_contribution(
+            session, contribution, embed=embed_set
+        ),
+        include=include,
     )
 
 
@@ -45,6 +130,7 @@ def read_contribution(session: SessionDep, contribution_id: str):
     "/contributions/{contribution_id}",
     response_model=ContributionWithAttributesShortPublic,
 )
+@async_session_route
 def update_contribution(
     session: SessionDep,
     contribution_id: str,
@@ -65,30 +151,154 @@ def update_contribution(
     "/contributions",
     response_model=list[ContributionWithAttributesShortPublic],
 )
-def read_contributions(session: SessionDep, skip: int = 0, limit: int = 100):
-    statement = select(Contribution).offset(skip).limit(limit)
-    contributions = session.exec(statement).all()
-    return [
-        ContributionWithAttributesShortPublic.from_contribution(
-            session, contribution[0]
+@async_session_route
+def read_contributions(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+    tag: list[int] = Query(default=[]),
+    contributor: list[int] = Query(default=[]),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    archived: Optional[bool] = None,
+    sort: crud.ContributionSortKey = "date",
+    fields: Optional[str] = FieldsQuery,
+    embed: Optional[str] = EmbedQuery,
+    ids: Optional[str] = Query(
+        default=None,
+        description="Comma-separated IDs of the contributions to return, in this "
+        f"order. Cannot be combined with pagination, filters or sort, IDs not "
+        f"found are listed, percent-encoded, in the `{MISSING_IDS_HEADER}` header.",
+    ),
+):
+    embed_set, include = sparse_fieldset(
+        ContributionWithAttributesShortPublic, crud.CONTRIBUTION_EMBEDS, fields, embed
+    )
+    contribution_ids = comma_separated(ids, "ids")
+    if contribution_ids is not None:
+        reject_page_parameters(request, "ids", _PAGE_PARAMETERS)
+        version = crud.select_contributions_version(
+            session=session, contribution_ids=contribution_ids
         )
-        for contribution in contributions
-    ]
+        not_modified = conditional_response(request, response, version or "")
+        if not_modified is not None:
+            return not_modified
+        contributions, missing = crud.select_contributions_by_ids(
+            session=session, contribution_ids=contribution_ids, embed=embed_set
+        )
+        set_missing_ids(response, missing)
+        return model_response(
+            response,
+            [
+                ContributionWithAttributesShortPublic.from_contribution(
+                    session, contribution, embed=embed_set
+                )
+                for contribution in contributions
+            ],
+            include=include,
+        )
+
+    page = dict(
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        tags=tag,
+        contributors=contributor,
+        date_from=date_from,
+        date_to=date_to,
+        archived=archived,
+        sort=sort,
+    )
+    page_ids = select(crud.contributions_page(**page).subquery().c.id)
+    version = crud.select_contributions_version(
+        session=session, contribution_ids=page_ids
+    )
+    not_modified = conditional_response(request, response, version or "")
+    if not_modified is not None:
+        return not_modified
+    contributions, next_cursor = crud.select_contributions(
+        session=session, embed=embed_set, **page
+    )
+    set_next_cursor(response, next_cursor)
+    return model_response(
+        response,
+        [
+            ContributionWithAttributesShortPublic.from_contribution(
+                session, contribution, embed=embed_set
+            )
+            for contribution in contributions
+        ],
+        include=include,
+    )
 
 
 @router.get(
     "/contributions/{contribution_id}/children",
     response_model=list[ContributionShort],
 )
+@async_session_route
 def read_contribution_children(session: SessionDep, contribution_id: str):
     contribution = crud.select_contribution_by_id(
         session=session, contribution_id=contribution_id
     )
     if contribution is None:
         raise NotFoundError(what="Contribution")
+    return ContributionShort.from_contributions(session, contribution.dependents)
+
+
+@router.get(
+    "/contributions/{contribution_id}/ancestors",
+    response_model=list[ContributionNode],
+)
+@async_session_route
+def read_contribution_ancestors(
+    session: SessionDep,
+    contribution_id: str,
+    max_depth: int = Query(default=10, ge=1, le=100),
+):
+    return read_contribution_lineage(
+        session, contribution_id, "ancestors", max_depth=max_depth
+    )
+
+
+@router.get(
+    "/contributions/{contribution_id}/descendants",
+    response_model=list[ContributionNode],
+)
+@async_session_route
+def read_contribution_descendants(
+    session: SessionDep,
+    contribution_id: str,
+    max_depth: int = Query(default=10, ge=1, le=100),
+):
+    return read_contribution_lineage(
+        session, contribution_id, "descendants", max_depth=max_depth
+    )
+
+
+def read_contribution_lineage(
+    session: Session,
+    contribution_id: str,
+    direction: Literal["ancestors", "descendants"],
+    max_depth: int,
+) -> list[ContributionNode]:
+    contribution = crud.select_contribution_by_id(
+        session=session, contribution_id=contribution_id
+    )
+    if contribution is None:
+        raise NotFoundError(what="Contribution")
+    lineage = crud.select_contribution_lineage(
+        session=session,
+        contribution_id=contribution_id,
+        direction=direction,
+        max_depth=max_depth,
+    )
     return [
-        ContributionShort.from_contribution(session, dependent)
-        for dependent in contribution.dependents
+        ContributionNode.model_validate(contribution, update={"depth": depth})
+        for contribution, depth in lineage
     ]
 
 
@@ -96,6 +306,7 @@ def read_contribution_children(session: SessionDep, contribution_id: str):
     "/contributions/{contribution_id}/contributors",
     response_model=list[ContributorShort],
 )
+@async_session_route
 def read_contribution_contributors(session: SessionDep, contribution_id: str):
     contribution = crud.select_contribution_by_id(
         session=session, contribution_id=contribution_id
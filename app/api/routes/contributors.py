@@ -1,9 +1,24 @@
-from fastapi import APIRouter
-from sqlalchemy import select
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request, Response, status
+from sqlmodel import select
 
 from app import crud
-from app.api.deps import SessionDep
-from app.core.exceptions import NotFoundError
+from app.api.deps import (
+    MISSING_IDS_HEADER,
+    CursorQuery,
+    EmbedQuery,
+    FieldsQuery,
+    SessionDep,
+    async_session_route,
+    comma_separated,
+    reject_page_parameters,
+    set_missing_ids,
+    set_next_cursor,
+)
+from app.api.etag import conditional_response
+from app.api.responses import model_response, sparse_fieldset
+from app.core.exceptions import ConditionError, NotFoundError
 from app.models import (
     ContributionShort,
     Contributor,
@@ -15,8 +30,12 @@ from app.models import (
 
 router = APIRouter()
 
+# parameters of GET /contributors that select a page, which `ids` replaces
+_PAGE_PARAMETERS = ("skip", "limit", "cursor")
+
 
 @router.post("/contributors", response_model=ContributorWithAttributesShortPublic)
+@async_session_route
 def create_contributor(session: SessionDep, contributor_in: ContributorUpsert):
     if crud.integrity_check_contributor(session=session, contributor_in=contributor_in):
         return crud.create_contributor(session=session, contributor_in=contributor_in)
@@ -26,32 +45,85 @@ def create_contributor(session: SessionDep, contributor_in: ContributorUpsert):
     "/contributors/{contributor_id}",
     response_model=ContributorViewPublic,
 )
-def read_contributor(session: SessionDep, contributor_id: int):
+@async_session_route
+def read_contributor(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    contributor_id: int,
+    fields: Optional[str] = FieldsQuery,
+    embed: Optional[str] = EmbedQuery,
+):
+    embed_set, include = sparse_fieldset(
+        ContributorViewPublic, crud.CONTRIBUTOR_EMBEDS, fields, embed
+    )
+    version = crud.select_contributors_version(
+        session=session,
+        contributor_ids=[contributor_id],
+        with_reviewed_contributions=True,
+    )
+    if version is None:
+        raise NotFoundError(what="Contributor")
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
     db_contributor = crud.select_contributor_by_id(
         session=session, contributor_id=contributor_id
     )
     if db_contributor is None:
         raise NotFoundError(what="Contributor")
-    return ContributorViewPublic.from_contributor(session, db_contributor)
+    return model_response(
+        response,
+        ContributorViewPublic.from_contributor(session, db_contributor, embed_set),
+        include=include,
+    )
 
 
 @router.get(
     "/contributors/local_handle/{local_handle}",
     response_model=ContributorViewPublic,
 )
-def read_contributor_by_local_handle(session: SessionDep, local_handle: str):
+@async_session_route
+def read_contributor_by_local_handle(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    local_handle: str,
+    fields: Optional[str] = FieldsQuery,
+    embed: Optional[str] = EmbedQuery,
+):
+    embed_set, include = sparse_fieldset(
+        ContributorViewPublic, crud.CONTRIBUTOR_EMBEDS, fields, embed
+    )
+    version = crud.select_contributors_version(
+        session=session,
+        contributor_ids=select(Contributor.id).where(
+            Contributor.local_handle == local_handle
+        ),
+        with_reviewed_contributions=True,
+    )
+    if version is None:
+        raise NotFoundError(what="Contributor")
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
     db_contributor = crud.select_contributor_by_local_handle(
         session=session, local_handle=local_handle
     )
     if db_contributor is None:
         raise NotFoundError(what="Contributor")
-    return ContributorViewPublic.from_contributor(session, db_contributor)
+    return model_response(
+        response,
+        ContributorViewPublic.from_contributor(session, db_contributor, embed_set),
+        include=include,
+    )
 
 
 @router.put(
     "/contributors/{contributor_id}",
     response_model=ContributorWithAttributesShortPublic,
 )
+@async_session_route
 def update_contributor(
     session: SessionDep,
     contributor_id: int,
@@ -76,32 +148,117 @@ def update_contributor(
 
 
 @router.get("/contributors", response_model=list[ContributorWithAttributesShortPublic])
-def read_contributors(session: SessionDep, skip: int = 0, limit: int = 100):
-    statement = select(Contributor).offset(skip).limit(limit)
-    contributors = session.exec(statement).all()
-    return [
-        ContributorWithAttributesShortPublic.from_contributor(session, contributor[0])
-        for contributor in contributors
-    ]
+@async_session_route
+def read_contributors(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+    fields: Optional[str] = FieldsQuery,
+    embed: Optional[str] = EmbedQuery,
+    ids: Optional[str] = Query(
+        default=None,
+        description="Comma-separated IDs of the contributors to return, in this "
+        f"order. Cannot be combined with pagination, IDs not found are listed, "
+        f"percent-encoded, in the `{MISSING_IDS_HEADER}` header.",
+    ),
+    local_handles: Optional[str] = Query(
+        default=None,
+        description="Comma-separated local handles of the contributors to return, "
+        "like `ids`.",
+    ),
+):
+    embed_set, include = sparse_fieldset(
+        ContributorWithAttributesShortPublic,
+        crud.CONTRIBUTOR_EMBEDS - {"reviewed_contributions"},
+        fields,
+        embed,
+    )
+    contributor_ids = comma_separated(ids, "ids", cast=int)
+    handles = comma_separated(local_handles, "local_handles")
+    if contributor_ids is not None and handles is not None:
+        raise ConditionError(
+            condition="Conflicting parameters",
+            detail="Give either ids or local_handles",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    if contributor_ids is not None or handles is not None:
+        reject_page_parameters(
+            request, "ids" if handles is None else "local_handles", _PAGE_PARAMETERS
+        )
+        if handles is not None:
+            keys = select(Contributor.id).where(Contributor.local_handle.in_(handles))
+        else:
+            keys = contributor_ids
+        version = crud.select_contributors_version(
+            session=session, contributor_ids=keys
+        )
+        not_modified = conditional_response(request, response, version or "")
+        if not_modified is not None:
+            return not_modified
+        contributors, missing = crud.select_contributors_by_ids(
+            session=session, contributor_ids=contributor_ids, local_handles=handles
+        )
+        set_missing_ids(response, missing)
+        return model_response(
+            response,
+            ContributorWithAttributesShortPublic.from_contributors(
+                session, contributors, embed_set
+            ),
+            include=include,
+        )
+    page = crud.contributors_page(skip=skip, limit=limit, cursor=cursor).subquery()
+    version = crud.select_contributors_version(
+        session=session, contributor_ids=select(page.c.id)
+    )
+    not_modified = conditional_response(request, response, version or "")
+    if not_modified is not None:
+        return not_modified
+    contributors, next_cursor = crud.select_contributors(
+        session=session, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return model_response(
+        response,
+        ContributorWithAttributesShortPublic.from_contributors(
+            session, contributors, embed_set
+        ),
+        include=include,
+    )
 
 
 @router.get(
     "/contributors/{contributor_id}/reviewed_contributions",
     response_model=ContributorReviewedContributions,
 )
-def read_contributor_reviewed_contributions(session: SessionDep, contributor_id: int):
+@async_session_route
+def read_contributor_reviewed_contributions(
+    session: SessionDep,
+    response: Response,
+    contributor_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+):
     db_contributor = crud.select_contributor_by_id(
         session=session, contributor_id=contributor_id
     )
     if db_contributor is None:
         raise NotFoundError(what="Contributor")
     assert db_contributor.id is not None
-    reviewed_contributions = [
-        ContributionShort.from_contribution(session, contribution)
-        for contribution in crud.select_contributor_reviewed_contributions(
-            session=session, contributor_id=db_contributor.id
-        )
-    ]
+    contributions, next_cursor = crud.select_contributor_reviewed_contributions_page(
+        session=session,
+        contributor_id=db_contributor.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    set_next_cursor(response, next_cursor)
+    reviewed_contributions = ContributionShort.from_contributions(
+        session, contributions
+    )
     return ContributorReviewedContributions(
         reviewed_contributions=reviewed_contributions
     )
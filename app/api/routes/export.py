@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from collections.abc import Callable, Iterator
+from typing import Any, Literal
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, SQLModel
+
+from app import crud
+from app.core.db import engine
+from app.models import (
+    ContributionWithAttributesShortPublic,
+    ContributorPublic,
+    ReviewPublic,
+    TagShort,
+)
+
+router = APIRouter()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# rows fetched from the database, and rendered, at a time
+_BATCH_SIZE = 500
+
+
+def _csv_value(value: Any) -> Any:
+    # nested objects and lists are written as JSON
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _export_chunks(
+    select_batches: Callable,
+    render: Callable[[Session, Any], SQLModel],
+    model: type[SQLModel],
+    format: ExportFormat,
+) -> Iterator[str]:
+    # the session belongs to the stream, which outlives the route
+    with Session(engine) as session:
+        fields = list(model.model_fields)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(fields)
+        for batch in select_batches(session, batch_size=_BATCH_SIZE):
+            for row in batch:
+                item = render(session, row).model_dump(mode="json")
+                if format == "csv":
+                    writer.writerow([_csv_value(item[field]) for field in fields])
+                else:
+                    buffer.write(json.dumps(item) + "\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+
+def _export(
+    name: str,
+    select_batches: Callable,
+    render: Callable[[Session, Any], SQLModel],
+    model: type[SQLModel],
+    format: ExportFormat,
+) -> StreamingResponse:
+    return StreamingResponse(
+        _export_chunks(select_batches, render, model, format),
+        media_type=_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{format}"',
+        },
+    )
+
+
+@router.get("/export/contributions", response_class=StreamingResponse)
+def export_contributions(format: ExportFormat = "ndjson"):
+    return _export(
+        "contributions",
+        crud.export_contributions,
+        ContributionWithAttributesShortPublic.from_contribution,
+        ContributionWithAttributesShortPublic,
+        format,
+    )
+
+
+@router.get("/export/contributors", response_class=StreamingResponse)
+def export_contributors(format: ExportFormat = "ndjson"):
+    return _export(
+        "contributors",
+        crud.export_contributors,
+        lambda session, contributor: ContributorPublic.model_validate(contributor),
+        ContributorPublic,
+        format,
+    )
+
+
+@router.get("/export/reviews", response_class=StreamingResponse)
+def export_reviews(format: ExportFormat = "ndjson"):
+    return _export(
+        "reviews",
+        crud.export_reviews,
+        lambda session, review: ReviewPublic.model_validate(review),
+        ReviewPublic,
+        format,
+    )
+
+
+@router.get("/export/tags", response_class=StreamingResponse)
+def export_tags(format: ExportFormat = "ndjson"):
+    return _export(
+        "tags",
+        crud.export_tags,
+        lambda session, tag: TagShort.model_validate(tag),
+        TagShort,
+        format,
+    )
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from app import crud
+from app.api.deps import SessionDep, async_session_route
+from app.models import ContributionGraph
+
+router = APIRouter()
+
+
+@router.get("/graph", response_model=ContributionGraph)
+@async_session_route
+def read_graph(session: SessionDep):
+    return crud.select_contribution_graph(session=session)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+
+from app.core.cache import response_cache
+from app.core.db import async_engine, async_engine_waits, engine, engine_waits
+from app.core.pool import pool_stats
+from app.models import PoolStats, ResponseCacheStats
+
+router = APIRouter()
+
+
+@router.get("/metrics/cache", response_model=ResponseCacheStats)
+def read_cache_metrics():
+    return ResponseCacheStats(**response_cache.stats())
+
+
+@router.get("/metrics/pool", response_model=list[PoolStats])
+def read_pool_metrics():
+    return [
+        PoolStats(**pool_stats("sync", engine, engine_waits)),
+        PoolStats(**pool_stats("async", async_engine.sync_engine, async_engine_waits)),
+    ]
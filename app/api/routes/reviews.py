@@ -1,8 +1,12 @@
-from fastapi import APIRouter
-from sqlalchemy import select
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+from sqlmodel import select
 
 from app import crud
-from app.api.deps import SessionDep
+from app.api.deps import CursorQuery, SessionDep, async_session_route, set_next_cursor
+from app.api.etag import conditional_response
+from app.api.responses import model_response
 from app.core.exceptions import NotFoundError
 from app.models import Message, Review, ReviewCreate, ReviewPublic, ReviewUpdate
 
@@ -10,12 +14,22 @@ router = APIRouter()
 
 
 @router.post("/reviews", response_model=ReviewPublic)
+@async_session_route
 def create_review(session: SessionDep, review: ReviewCreate):
     return crud.create_review(session=session, review_in=review)
 
 
 @router.get("/reviews/{review_id}", response_model=ReviewPublic)
-def read_review(session: SessionDep, review_id: int):
+@async_session_route
+def read_review(
+    session: SessionDep, request: Request, response: Response, review_id: int
+):
+    version = crud.select_reviews_version(session=session, review_ids=[review_id])
+    if version is None:
+        raise NotFoundError(what=f"Review ID {review_id}")
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
     review = crud.select_review_by_id(session=session, review_id=review_id)
     if review is None:
         raise NotFoundError(what=f"Review ID {review_id}")
@@ -23,6 +37,7 @@ def read_review(session: SessionDep, review_id: int):
 
 
 @router.put("/reviews/{review_id}", response_model=ReviewPublic)
+@async_session_route
 def update_review(session: SessionDep, review_id: int, review_in: ReviewUpdate):
     db_review = session.get(Review, review_id)
     if not db_review:
@@ -34,17 +49,34 @@ def update_review(session: SessionDep, review_id: int, review_in: ReviewUpdate):
 
 
 @router.get("/reviews", response_model=list[ReviewPublic])
-def read_reviews(session: SessionDep, skip: int = 0, limit: int = 100):
-    statement = select(Review).offset(skip).limit(limit)
-    reviews = session.exec(statement).all()
-    return [review[0] for review in reviews]
+@async_session_route
+def read_reviews(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+):
+    page = crud.reviews_page(skip=skip, limit=limit, cursor=cursor).subquery()
+    version = crud.select_reviews_version(session=session, review_ids=select(page.c.id))
+    not_modified = conditional_response(request, response, version or "")
+    if not_modified is not None:
+        return not_modified
+    reviews, next_cursor = crud.select_reviews(
+        session=session, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return model_response(
+        response, [ReviewPublic.model_validate(review) for review in reviews]
+    )
 
 
 @router.delete("/reviews/{review_id}", response_model=Message)
+@async_session_route
 def delete_review(session: SessionDep, review_id: int):
     review = crud.select_review_by_id(session, review_id)
     if not review:
         raise NotFoundError(what="Review")
-    session.delete(review)
-    session.commit()
+    crud.delete_review(session, review)
     return Message(message="Review deleted successfully")
@@ -1,11 +1,14 @@
-from fastapi import APIRouter
-from sqlalchemy import select
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+from sqlmodel import select
 
 from app import crud
-from app.api.deps import SessionDep
+from app.api.deps import CursorQuery, SessionDep, async_session_route, set_next_cursor
+from app.api.etag import conditional_response
+from app.api.responses import model_response
 from app.core.exceptions import NotFoundError
 from app.models import (
-    ContributionShort,
     Message,
     Tag,
     TagCreate,
@@ -18,48 +21,81 @@ router = APIRouter()
 
 
 @router.post("/tags", response_model=TagPublic)
+@async_session_route
 def create_tag(session: SessionDep, tag: TagCreate):
     if crud.integrity_check_tag(session, tag):
-        return crud.create_tag(session, tag)
+        return TagPublic.from_tag(session, crud.create_tag(session, tag))
 
 
 @router.get("/tags/{tag_id}", response_model=TagViewPublic)
-def read_tag(session: SessionDep, tag_id: int):
+@async_session_route
+def read_tag(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    tag_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+):
+    page = crud.tag_contributions_page(
+        tag_id, skip=skip, limit=limit, cursor=cursor
+    ).subquery()
+    version = crud.select_tags_version(
+        session=session, tag_ids=[tag_id], contribution_ids=select(page.c.id)
+    )
+    if version is None:
+        raise NotFoundError(what="Tag")
+    not_modified = conditional_response(request, response, version)
+    if not_modified is not None:
+        return not_modified
     tag = crud.select_tag_by_id(session, tag_id)
     if tag is None:
         raise NotFoundError(what="Tag")
-    return TagViewPublic.model_validate(
-        tag,
-        update={
-            "contributions": [
-                ContributionShort.from_contribution(session, contribution)
-                for contribution in tag.contributions
-            ]
-        },
+    contributions, next_cursor = crud.select_tag_contributions(
+        session=session, tag_id=tag_id, skip=skip, limit=limit, cursor=cursor
     )
+    set_next_cursor(response, next_cursor)
+    return model_response(response, TagViewPublic.from_tag(session, tag, contributions))
 
 
 @router.put("/tags/{tag_id}", response_model=TagPublic)
+@async_session_route
 def update_tag(session: SessionDep, tag_id: int, tag_in: TagUpdate):
     tag = session.get(Tag, tag_id)
     if not tag:
         raise NotFoundError(what="Tag")
     if crud.integrity_check_tag(session, tag_in, tag_id):
-        return crud.update_tag(session, tag, tag_in)
+        return TagPublic.from_tag(session, crud.update_tag(session, tag, tag_in))
 
 
 @router.delete("/tags/{tag_id}", response_model=Message)
+@async_session_route
 def delete_tag(session: SessionDep, tag_id: int):
     tag = crud.select_tag_by_id(session, tag_id)
     if not tag:
         raise NotFoundError(what="Tag")
-    session.delete(tag)
-    session.commit()
+    crud.delete_tag(session, tag)
     return Message(message="Tag deleted successfully")
 
 
 @router.get("/tags", response_model=list[TagPublic])
-def read_tags(session: SessionDep, skip: int = 0, limit: int = 100):
-    statement = select(Tag).offset(skip).limit(limit)
-    tags = session.exec(statement).all()
-    return [tag[0] for tag in tags]
+@async_session_route
+def read_tags(
+    session: SessionDep,
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CursorQuery,
+):
+    page = crud.tags_page(skip=skip, limit=limit, cursor=cursor).subquery()
+    version = crud.select_tags_version(session=session, tag_ids=select(page.c.id))
+    not_modified = conditional_response(request, response, version or "")
+    if not_modified is not None:
+        return not_modified
+    tags, next_cursor = crud.select_tags(
+        session=session, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, next_cursor)
+    return model_response(response, TagPublic.from_tags(session, tags))
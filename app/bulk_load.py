@@ -0,0 +1,230 @@
+"""
+Load NDJSON or CSV files into the database with COPY.
+
+Each file holds rows of one table, named after the file, e.g.
+`contributor.csv` or `contributiontaglink.ndjson`; a directory stands for the
+files it contains. Columns are given by the CSV header or the NDJSON keys, the
+same on every line, and use the database names. Files are copied into staging
+tables, then inserted into their table in dependency order with one
+INSERT ... ON CONFLICT each, all in a single transaction. Of rows repeating a
+primary key, the last one is loaded.
+
+The response caches of running API processes are not reached: responses they
+cached before the load are served until they expire, after
+RESPONSE_CACHE_TTL seconds.
+
+    python -m app.bulk_load snapshot/ --on-conflict update
+"""
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Literal
+
+from psycopg import Connection, sql
+from sqlalchemy import Integer
+from sqlmodel import SQLModel
+from structlog import get_logger
+
+from app import crud  # noqa: F401, imports the models and registers the tables
+from app.core.cache import response_cache
+from app.core.db import engine
+
+_LOGGER = get_logger()
+
+OnConflict = Literal["nothing", "update"]
+
+# tables in the order they can be loaded in, referenced tables first
+TABLES = [
+    "contributor",
+    "tag",
+    "contribution",
+    "review",
+    "contributioncontributorlink",
+    "contributiontaglink",
+    "contributiondependencylink",
+    "contributorreviewlink",
+]
+
+_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# bytes read from a CSV file per write to the COPY stream
+_COPY_BLOCK_SIZE = 1024 * 1024
+
+# column numbering the rows of a staging table
+_STAGING_ROW = "staging_row"
+
+# cached responses rendering loaded rows, when loading in an API process
+_INVALIDATED_NAMESPACES = (
+    "contributions",
+    "contributors",
+    "tags",
+    "reviews",
+    "graph",
+    "autocomplete",
+)
+
+
+def _columns(path: Path, format: str) -> list[str]:
+    with path.open(newline="") as file:
+        if format == "csv":
+            return next(csv.reader(file), [])
+        line = next((line for line in file if line.strip()), "{}")
+        return list(json.loads(line))
+
+
+def _copy_file(
+    connection: Connection, staging: str, path: Path, format: str, columns: list[str]
+) -> None:
+    statement = sql.SQL("COPY {} ({}) FROM STDIN {}").format(
+        sql.Identifier(staging),
+        sql.SQL(", ").join(map(sql.Identifier, columns)),
+        sql.SQL("(FORMAT csv, HEADER true)" if format == "csv" else ""),
+    )
+    with connection.cursor() as cursor, cursor.copy(statement) as copy:
+        if format == "csv":
+            # the server parses the CSV itself
+            with path.open("rb") as file:
+                while block := file.read(_COPY_BLOCK_SIZE):
+                    copy.write(block)
+        else:
+            with path.open() as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    if row.keys() != set(columns):
+                        raise ValueError(
+                            f"{path}: keys {', '.join(sorted(row))} differ from "
+                            f"the first line's {', '.join(sorted(columns))}"
+                        )
+                    copy.write_row(
+                        [
+                            json.dumps(value)
+                            if isinstance(value, (dict, list))
+                            else value
+                            for value in (row[column] for column in columns)
+                        ]
+                    )
+
+
+def _load_table(
+    connection: Connection, table: str, paths: list[Path], on_conflict: OnConflict
+) -> int:
+    """Copy the files of `table` into a staging table, then insert them."""
+    metadata_table = SQLModel.metadata.tables[table]
+    staging = f"staging_{table}"
+    columns = [
+        column.name for column in metadata_table.columns if column.computed is None
+    ]
+    connection.execute(
+        sql.SQL(
+            "CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+        ).format(
+            sql.Identifier(staging),
+            sql.SQL(", ").join(map(sql.Identifier, columns)),
+            sql.Identifier(table),
+        )
+    )
+    # numbers the staged rows in file order, filled in by COPY
+    connection.execute(
+        sql.SQL("ALTER TABLE {} ADD COLUMN {} bigserial").format(
+            sql.Identifier(staging), sql.Identifier(_STAGING_ROW)
+        )
+    )
+
+    loaded_columns: list[str] = []
+    for path in paths:
+        format = _FORMATS[path.suffix]
+        file_columns = _columns(path, format)
+        unknown = set(file_columns) - set(columns)
+        if unknown:
+            raise ValueError(f"{path}: unknown columns {', '.join(sorted(unknown))}")
+        _copy_file(connection, staging, path, format, file_columns)
+        loaded_columns += [c for c in file_columns if c not in loaded_columns]
+
+    primary_key = [column.name for column in metadata_table.primary_key]
+    updated = [column for column in loaded_columns if column not in primary_key]
+    conflict = sql.SQL("DO NOTHING")
+    if on_conflict == "update" and updated:
+        assignments = [
+            sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(column))
+            for column in updated
+        ]
+        # the ORM sets it on update, the versions and ETags of rows depend on it
+        if "updated_at" in metadata_table.c and "updated_at" not in updated:
+            assignments.append(sql.SQL("updated_at = now()"))
+        conflict = sql.SQL("({}) DO UPDATE SET {}").format(
+            sql.SQL(", ").join(map(sql.Identifier, primary_key)),
+            sql.SQL(", ").join(assignments),
+        )
+    loaded = sql.SQL(", ").join(map(sql.Identifier, loaded_columns))
+    rows = sql.SQL("SELECT {} FROM {}").format(loaded, sql.Identifier(staging))
+    if set(primary_key) <= set(loaded_columns):
+        # a row can't be updated twice by one INSERT ... ON CONFLICT
+        key = sql.SQL(", ").join(map(sql.Identifier, primary_key))
+        rows = sql.SQL(
+            "SELECT DISTINCT ON ({0}) {1} FROM {2} ORDER BY {0}, {3} DESC"
+        ).format(key, loaded, sql.Identifier(staging), sql.Identifier(_STAGING_ROW))
+    cursor = connection.execute(
+        sql.SQL("INSERT INTO {} ({}) {} ON CONFLICT {}").format(
+            sql.Identifier(table), loaded, rows, conflict
+        )
+    )
+
+    # keep serial IDs clear of the loaded ones
+    if "id" in loaded_columns and isinstance(metadata_table.c.id.type, Integer):
+        connection.execute(
+            sql.SQL(
+                "SELECT setval(pg_get_serial_sequence({0}, 'id'), "
+                "coalesce(max(id), 0) + 1, false) FROM {1}"
+            ).format(sql.Literal(table), sql.Identifier(table))
+        )
+    return cursor.rowcount
+
+
+def load_files(
+    paths: list[Path], on_conflict: OnConflict = "nothing"
+) -> dict[str, int]:
+    """Load the given files, or the files of the given directories, in a single
+    transaction. Returns the number of rows inserted or updated per table."""
+    files: dict[str, list[Path]] = {}
+    for path in paths:
+        for file in sorted(path.iterdir()) if path.is_dir() else [path]:
+            if file.suffix not in _FORMATS:
+                continue
+            if file.stem not in TABLES:
+                raise ValueError(f"{file}: unknown table {file.stem}")
+            files.setdefault(file.stem, []).append(file)
+
+    counts = {}
+    with engine.begin() as connection:
+        dbapi_connection = connection.connection.driver_connection
+        for table in TABLES:
+            if table in files:
+                counts[table] = _load_table(
+                    dbapi_connection, table, files[table], on_conflict
+                )
+                _LOGGER.info("Table loaded", table=table, rows=counts[table])
+    # reaches the cache of this process only, see the module docstring
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load NDJSON or CSV files into the database with COPY."
+    )
+    parser.add_argument("paths", nargs="+", type=Path, help="files or directories")
+    parser.add_argument(
+        "--on-conflict",
+        choices=["nothing", "update"],
+        default="nothing",
+        help="skip rows whose primary key exists, or update them",
+    )
+    args = parser.parse_args()
+    load_files(args.paths, on_conflict=args.on_conflict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from threading import Lock
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class ResponseCache(ABC):
+    """In-process cache of rendered responses, organised in namespaces.
+
+    Writers invalidate whole namespaces. Each namespace has a generation,
+    bumped on invalidation: a value computed from data read before an
+    invalidation is stored only if the generation it was read under is
+    still current, so a concurrent write never leaves a stale entry behind.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def generation(self, namespace: str) -> int:
+        pass
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, generation: int) -> None:
+        pass
+
+    @abstractmethod
+    def invalidate(self, *namespaces: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        pass
+
+
+class NullCache(ResponseCache):
+    """Caches nothing."""
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return None
+
+    def generation(self, namespace: str) -> int:
+        return 0
+
+    def set(self, namespace: str, key: str, value: Any, generation: int) -> None:
+        pass
+
+    def invalidate(self, *namespaces: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return dict(hits=0, misses=0, evictions=0, entries=0, size=0)
+
+
+class LRUCache(ResponseCache):
+    """Least recently used cache, bounded in number of entries and total size
+    (as measured by `weigh`), whose entries expire after `ttl` seconds."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_size: int,
+        ttl: float,
+        weigh: Callable[[Any], int] = lambda value: 1,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.ttl = ttl
+        self.weigh = weigh
+        self._lock = Lock()
+        # (namespace, key) -> (expires at, size, value)
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[float, int, Any]
+        ] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._epoch = 0  # bumped by clear, generation of every namespace
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove((namespace, key))
+                self._misses += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            self._hits += 1
+            return entry[2]
+
+    def generation(self, namespace: str) -> int:
+        with self._lock:
+            return self._generation(namespace)
+
+    def set(self, namespace: str, key: str, value: Any, generation: int) -> None:
+        size = self.weigh(value)
+        if size > self.max_size:
+            return
+        with self._lock:
+            if self._generation(namespace) != generation:
+                return
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, size, value)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, *namespaces: str) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for entry_key in [key for key in self._entries if key[0] in namespaces]:
+                self._remove(entry_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size=self._size,
+            )
+
+    def _generation(self, namespace: str) -> int:
+        return self._epoch + self._generations.get(namespace, 0)
+
+    def _remove(self, entry_key: tuple[str, str]) -> None:
+        _, size, _ = self._entries.pop(entry_key)
+        self._size -= size
+
+
+def build_response_cache() -> ResponseCache:
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return LRUCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+            ttl=settings.RESPONSE_CACHE_TTL,
+            weigh=lambda response: len(response.content),
+        )
+    return NullCache()
+
+
+response_cache = build_response_cache()
@@ -17,6 +17,25 @@ class Settings(BaseSettings):
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
     SENTRY_DSN: HttpUrl | None = None
 
+    # connection pool, shared by the sync and async engines
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30  # seconds waiting for a connection
+    DATABASE_POOL_RECYCLE: int = 1800  # seconds, -1 to keep connections forever
+    DATABASE_POOL_PRE_PING: bool = True
+    # behind PgBouncer in transaction mode: no pool, no prepared statements
+    DATABASE_PGBOUNCER: bool = False
+
+    # serve routes on the event loop with the async driver instead of running
+    # them, and their database round-trips, in the threadpool
+    DATABASE_ASYNC: bool = False
+
+    # in-process cache of GET responses, invalidated on writes
+    RESPONSE_CACHE_BACKEND: Literal["memory", "none"] = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_SIZE: int = 64 * 1024 * 1024  # bytes
+    RESPONSE_CACHE_TTL: float = 60  # seconds
+
     @computed_field  # type: ignore[misc]
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
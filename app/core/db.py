@@ -1,12 +1,40 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, create_engine
 from structlog import get_logger
 
 from app.core.config import settings
+from app.core.pool import WaitHistogram
 
 _LOGGER = get_logger()
 
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+def engine_options() -> dict[str, Any]:
+    if settings.DATABASE_PGBOUNCER:
+        # PgBouncer pools the connections, and in transaction mode consecutive
+        # transactions may run on different server connections, which would
+        # not know the statements psycopg prepared
+        return dict(poolclass=NullPool, connect_args={"prepare_threshold": None})
+    return dict(
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+
+
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options())
+# psycopg 3 serves both engines, the async one picks its asyncio connections
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options()
+)
+
+# time spent by requests waiting for a connection of each engine
+engine_waits = WaitHistogram()
+async_engine_waits = WaitHistogram()
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
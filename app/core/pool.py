@@ -0,0 +1,68 @@
+import time
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import Engine
+from sqlalchemy.pool import QueuePool
+
+# upper bounds of the wait time histogram buckets, in seconds
+_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class WaitHistogram:
+    """Cumulative histogram of the time requests wait for a connection."""
+
+    def __init__(self, buckets: tuple[float, ...] = _WAIT_BUCKETS) -> None:
+        self._lock = Lock()
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._count += 1
+            self._sum += seconds
+            for i, bound in enumerate(self._buckets):
+                if seconds <= bound:
+                    self._counts[i] += 1
+
+    def start(self) -> float:
+        return time.perf_counter()
+
+    def stop(self, start: float) -> None:
+        self.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(
+                wait_count=self._count,
+                wait_sum=self._sum,
+                wait_buckets=[
+                    dict(le=bound, count=count)
+                    for bound, count in zip(self._buckets, self._counts)
+                ],
+            )
+
+
+def pool_stats(name: str, engine: Engine, waits: WaitHistogram) -> dict[str, Any]:
+    """Live statistics of the connection pool of `engine`. Occupancy is only
+    known for queue pools: without a pool, e.g. behind PgBouncer, it is None."""
+    pool = engine.pool
+    stats: dict[str, Any] = dict(
+        name=name,
+        pool=type(pool).__name__,
+        size=None,
+        checked_out=None,
+        checked_in=None,
+        overflow=None,
+    )
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    stats.update(waits.stats())
+    return stats
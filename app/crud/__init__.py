@@ -1,4 +1,6 @@
 from app.crud.contributions import *  # noqa
 from app.crud.contributors import *  # noqa
+from app.crud.loaders import *  # noqa
 from app.crud.reviews import *  # noqa
 from app.crud.tags import *  # noqa
+from app.crud.versions import *  # noqa
@@ -1,48 +1,73 @@
 import random
 import string
-from typing import Tuple
+from datetime import datetime
+from typing import Iterable, Iterator, Literal, Optional, Sequence, Tuple
 
+from sqlalchemy import func, insert, literal
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased, joinedload, selectinload
 from sqlmodel import Session, select
 from structlog import get_logger
 
-from app.core.exceptions import NotFoundError
-from app.crud.contributors import select_contributor_by_id
-from app.crud.tags import select_tag_by_id
-from app.crud.utils import update_links
+from app.core.cache import response_cache
+from app.core.exceptions import ConditionError
+from app.crud.utils import (
+    next_page_cursor,
+    paginate,
+    select_by_ids,
+    select_by_keys,
+    select_existing_ids,
+    select_in_batches,
+    update_links,
+)
 from app.models import (
     Contribution,
+    ContributionBulkItem,
+    ContributionBulkResult,
     ContributionContributorLink,
     ContributionCreate,
+    ContributionDependencyLink,
+    ContributionGraph,
+    ContributionGraphEdge,
+    ContributionGraphNode,
+    ContributionTagLink,
     ContributionUpdate,
     Contributor,
+    Review,
+    Tag,
 )
 
 _LOGGER = get_logger()
 
+# cached responses rendering contributions
+_INVALIDATED_NAMESPACES = ("contributions", "contributors", "tags", "graph")
+
+# relationships rendered with a contribution, see `contribution_load_options`
+CONTRIBUTION_EMBEDS = frozenset({"contributors", "tags", "reviews", "dependencies"})
+
+ContributionSortKey = Literal[
+    "date", "-date", "created_at", "-created_at", "updated_at", "-updated_at"
+]
+
+
+def generate_contribution_id() -> str:
+    # generate 8 length string for contribution ID
+    return "".join(random.choices(string.ascii_lowercase + string.digits, k=8))
+
 
 def create_contribution(
     session: Session, contribution: ContributionCreate
 ) -> Tuple[Contribution, list[Contributor]]:
     _LOGGER.info("Creating new contribution")
-    tags = []
-    for tag_id in contribution.tags:
-        tag = select_tag_by_id(session, tag_id)
-        if tag is None:
-            raise NotFoundError(what=f"Tag ID {tag_id}")
-        tags.append(tag)
-
-    dependencies = []
-    for dependency_id in contribution.dependencies:
-        dependency = select_contribution_by_id(session, dependency_id)
-        if dependency is None:
-            raise NotFoundError(what=f"Dependency ID {dependency_id}")
-        dependencies.append(dependency)
-
-    # generate 8 length string for contribution ID
-    contribution_id = "".join(
-        random.choices(string.ascii_lowercase + string.digits, k=8)
+    tags, dependencies, contributors = select_by_ids(
+        session,
+        (Tag, contribution.tags, "Tag ID"),
+        (Contribution, contribution.dependencies, "Dependency ID"),
+        (Contributor, contribution.contributors, "Contributor ID"),
     )
 
+    contribution_id = generate_contribution_id()
+
     # as its a many to many relationship, we create the object differently
     # https://sqlmodel.tiangolo.com/tutorial/many-to-many/create-data/
     contribution_db = Contribution(
@@ -71,25 +96,243 @@ def create_contribution(
     session.add(contribution_db)
 
     # handle differently because it is a many to many relationship with extra field
-    contributors: list[Contributor] = []
-    for contributor_order, contributor_id in enumerate(contribution.contributors):
-        contributor = select_contributor_by_id(session, contributor_id)
-        if contributor is None:
-            raise NotFoundError(what=f"Contributor ID {contributor_id}")
+    for contributor_order, contributor in enumerate(contributors):
         contribution_contributor_link = ContributionContributorLink(
             contribution=contribution_db,
             contributor=contributor,
             contributor_order=contributor_order,
         )
-        contributors.append(contributor)
         session.add(contribution_contributor_link)
 
     session.commit()
-    session.refresh(contribution_db)
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
+    contribution_db = reload_contribution(session, contribution_db)
     _LOGGER.info("Contribution created", contribution_id=contribution_db.id)
     return contribution_db, contributors
 
 
+def create_contributions_bulk(
+    session: Session, items: list[ContributionBulkItem]
+) -> list[ContributionBulkResult]:
+    """Create many contributions in one transaction.
+
+    Referenced tags, contributors and dependencies are checked with one query
+    per type. Dependencies may name the `ref` of another item of the batch;
+    refs must not be IDs of existing contributions. Items referencing missing
+    rows or failed items, or lying on a cycle, are reported and skipped, the
+    others are inserted with bulk statements.
+    """
+    _LOGGER.info("Creating contributions in bulk", count=len(items))
+    results = [
+        ContributionBulkResult(index=index, ref=item.ref)
+        for index, item in enumerate(items)
+    ]
+    refs: dict[str, int] = {}
+    for result in results:
+        if result.ref is None:
+            continue
+        if result.ref in refs:
+            result.error = f"Duplicated ref {result.ref}"
+        else:
+            refs[result.ref] = result.index
+
+    existing_tags = select_existing_ids(
+        session, Tag.id, (tag_id for item in items for tag_id in item.tags)
+    )
+    existing_contributors = select_existing_ids(
+        session,
+        Contributor.id,
+        (contributor_id for item in items for contributor_id in item.contributors),
+    )
+    # refs are looked up too, as they must not shadow existing contributions
+    existing_dependencies = select_existing_ids(
+        session,
+        Contribution.id,
+        (
+            *refs,
+            *(
+                dependency
+                for item in items
+                for dependency in item.dependencies
+                if dependency not in refs
+            ),
+        ),
+    )
+    for ref in refs:
+        if ref in existing_dependencies:
+            results[refs[ref]].error = f"Ref {ref} is an existing contribution ID"
+    for item, result in zip(items, results):
+        missing = [
+            *(f"Tag ID {id}" for id in item.tags if id not in existing_tags),
+            *(
+                f"Contributor ID {id}"
+                for id in item.contributors
+                if id not in existing_contributors
+            ),
+            *(
+                f"Dependency ID {id}"
+                for id in item.dependencies
+                if id not in refs and id not in existing_dependencies
+            ),
+        ]
+        if result.error is not None:
+            continue
+        if missing:
+            result.error = f"{', '.join(missing)} cannot be found."
+        elif len(set(item.contributors)) < len(item.contributors):
+            result.error = "Duplicated contributor"
+
+    # insert items in dependency order, so that failures propagate to
+    # dependents; when no item is ready, the items left lie on or behind a cycle
+    pending = {result.index for result in results if result.error is None}
+    while pending:
+        ready = [
+            index
+            for index in sorted(pending)
+            if all(
+                refs[dependency] not in pending
+                for dependency in items[index].dependencies
+                if dependency in refs
+            )
+        ]
+        if not ready:
+            cycle = _cycle_members(
+                {
+                    index: [
+                        refs[dependency]
+                        for dependency in items[index].dependencies
+                        if dependency in refs and refs[dependency] in pending
+                    ]
+                    for index in pending
+                }
+            )
+            for index in cycle:
+                results[index].error = "Dependency cycle"
+            pending -= cycle
+            continue
+        for index in ready:
+            pending.remove(index)
+            failed = [
+                dependency
+                for dependency in items[index].dependencies
+                if dependency in refs and results[refs[dependency]].id is None
+            ]
+            if failed:
+                results[index].error = f"Dependencies {', '.join(failed)} failed"
+            else:
+                results[index].id = generate_contribution_id()
+
+    created = [(item, result) for item, result in zip(items, results) if result.id]
+    if created:
+        session.execute(
+            insert(Contribution),
+            [
+                dict(
+                    id=result.id,
+                    title=item.title,
+                    short_title=item.short_title,
+                    date=item.date,
+                    discord_chat_link=str(item.discord_chat_link)
+                    if item.discord_chat_link is not None
+                    else None,
+                    github_link=str(item.github_link)
+                    if item.github_link is not None
+                    else None,
+                    forum_link=str(item.forum_link)
+                    if item.forum_link is not None
+                    else None,
+                    wiki_link=str(item.wiki_link)
+                    if item.wiki_link is not None
+                    else None,
+                    highlighted_discord_message=str(item.highlighted_discord_message)
+                    if item.highlighted_discord_message is not None
+                    else None,
+                    links=[link.model_dump(mode="json") for link in item.links],
+                    description=item.description,
+                    archived_at=item.archived_at,
+                    archive_reason=item.archive_reason,
+                )
+                for item, result in created
+            ],
+        )
+        link_rows = [
+            (
+                ContributionContributorLink,
+                [
+                    dict(
+                        contribution_id=result.id,
+                        contributor_id=contributor_id,
+                        contributor_order=contributor_order,
+                    )
+                    for item, result in created
+                    for contributor_order, contributor_id in enumerate(
+                        item.contributors
+                    )
+                ],
+            ),
+            (
+                ContributionTagLink,
+                [
+                    dict(contribution_id=result.id, tag_id=tag_id)
+                    for item, result in created
+                    for tag_id in set(item.tags)
+                ],
+            ),
+            (
+                ContributionDependencyLink,
+                [
+                    dict(
+                        dependent_id=result.id,
+                        dependency_id=results[refs[dependency]].id
+                        if dependency in refs
+                        else dependency,
+                    )
+                    for item, result in created
+                    for dependency in set(item.dependencies)
+                ],
+            ),
+        ]
+        for link_model, rows in link_rows:
+            if rows:
+                session.execute(insert(link_model), rows)
+        session.commit()
+        response_cache.invalidate(*_INVALIDATED_NAMESPACES)
+    _LOGGER.info(
+        "Contributions created in bulk",
+        created=len(created),
+        failed=len(items) - len(created),
+    )
+    return results
+
+
+def _cycle_members(dependencies: dict[int, list[int]]) -> set[int]:
+    """Nodes of the graph `dependencies` (node -> nodes it depends on) that
+    can reach themselves."""
+    members = set()
+    for start, edges in dependencies.items():
+        stack, seen = list(edges), set()
+        while stack:
+            node = stack.pop()
+            if node == start:
+                members.add(start)
+                break
+            if node not in seen:
+                seen.add(node)
+                stack.extend(dependencies[node])
+    return members
+
+
+def select_contributions_by_ids(
+    session: Session,
+    contribution_ids: list[str],
+    embed: Optional[Iterable[str]] = None,
+) -> Tuple[list[Contribution], list[str]]:
+    """The contributions with the given IDs, in the requested order, and the
+    IDs that do not exist."""
+    statement = select(Contribution).options(*contribution_load_options(embed))
+    return select_by_keys(session, statement, Contribution.id, contribution_ids)
+
+
 def select_contribution_by_id(
     session: Session, contribution_id: str
 ) -> Contribution | None:
@@ -98,40 +341,256 @@ def select_contribution_by_id(
     return contribution
 
 
+def reload_contribution(session: Session, contribution: Contribution) -> Contribution:
+    """Refresh a committed contribution along with everything rendered in the
+    API responses, in a fixed number of queries."""
+    statement = (
+        select(Contribution)
+        .where(Contribution.id == contribution.id)
+        .options(*contribution_load_options())
+        .execution_options(populate_existing=True)
+    )
+    return session.exec(statement).one()
+
+
+def contribution_short_load_options():
+    """Loader options fetching everything rendered by `ContributionShort`."""
+    return [
+        selectinload(Contribution.contributors).joinedload(
+            ContributionContributorLink.contributor
+        ),
+        selectinload(Contribution.tags),
+        selectinload(Contribution.reviews),
+        selectinload(Contribution.dependencies),
+    ]
+
+
+def contribution_load_options(embed: Optional[Iterable[str]] = None):
+    """Loader options fetching everything rendered by
+    `ContributionWithAttributesShortPublic`, dependencies included, or only
+    the `embed` relationships. Loads a whole page of contributions in a fixed
+    number of queries."""
+    options = {
+        "contributors": selectinload(Contribution.contributors).joinedload(
+            ContributionContributorLink.contributor
+        ),
+        "tags": selectinload(Contribution.tags),
+        "reviews": selectinload(Contribution.reviews).selectinload(Review.reviewers),
+        "dependencies": selectinload(Contribution.dependencies).options(
+            *contribution_short_load_options()
+        ),
+    }
+    embed = CONTRIBUTION_EMBEDS if embed is None else embed
+    return [option for relationship, option in options.items() if relationship in embed]
+
+
+def export_contributions(
+    session: Session, batch_size: int = 500
+) -> Iterator[Sequence[Contribution]]:
+    """Every contribution, by creation date, in batches of `batch_size`."""
+    statement = (
+        select(Contribution)
+        .order_by(Contribution.created_at, Contribution.id)
+        .options(*contribution_load_options())
+    )
+    return select_in_batches(session, statement, batch_size)
+
+
+def contributions_page(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    tags: Optional[list[int]] = None,
+    contributors: Optional[list[int]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    archived: Optional[bool] = None,
+    sort: ContributionSortKey = "date",
+):
+    """Statement selecting a page of contributions carrying all the given tags
+    and contributors, within the date range and archived state if given."""
+    statement = select(Contribution)
+    # one join per value: link primary keys guarantee no duplicated rows
+    for tag_id in tags or []:
+        tag_link = aliased(ContributionTagLink)
+        statement = statement.join(
+            tag_link,
+            (tag_link.contribution_id == Contribution.id) & (tag_link.tag_id == tag_id),
+        )
+    for contributor_id in contributors or []:
+        contributor_link = aliased(ContributionContributorLink)
+        statement = statement.join(
+            contributor_link,
+            (contributor_link.contribution_id == Contribution.id)
+            & (contributor_link.contributor_id == contributor_id),
+        )
+    if date_from is not None:
+        statement = statement.where(Contribution.date >= date_from)
+    if date_to is not None:
+        statement = statement.where(Contribution.date <= date_to)
+    if archived is not None:
+        statement = statement.where(
+            Contribution.archived_at.is_not(None)
+            if archived
+            else Contribution.archived_at.is_(None)
+        )
+    return paginate(
+        statement,
+        getattr(Contribution, sort.lstrip("-")),
+        Contribution.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        descending=sort.startswith("-"),
+    )
+
+
+def select_contributions(
+    session: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    tags: Optional[list[int]] = None,
+    contributors: Optional[list[int]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    archived: Optional[bool] = None,
+    sort: ContributionSortKey = "date",
+    embed: Optional[Iterable[str]] = None,
+) -> Tuple[list[Contribution], str | None]:
+    statement = contributions_page(
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        tags=tags,
+        contributors=contributors,
+        date_from=date_from,
+        date_to=date_to,
+        archived=archived,
+        sort=sort,
+    ).options(*contribution_load_options(embed))
+    contributions = session.exec(statement).all()
+    next_cursor = next_page_cursor(
+        contributions,
+        getattr(Contribution, sort.lstrip("-")),
+        Contribution.id,
+        limit=limit,
+        cursor=cursor,
+    )
+    return contributions, next_cursor
+
+
+def search_contributions(
+    session: Session, query: str, skip: int = 0, limit: int = 20
+) -> list[Tuple[Contribution, float, str, str]]:
+    """Full-text search over contribution titles and descriptions.
+    Returns contributions by decreasing rank, along with their rank and
+    highlighted title and description snippet."""
+    ts_query = func.websearch_to_tsquery("english", query)
+    rank = func.ts_rank(Contribution.search_vector, ts_query).label("rank")
+    page = (
+        select(Contribution.id, rank)
+        .where(Contribution.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Contribution.id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    # highlight the rows of the page only, ts_headline parses the whole document
+    statement = (
+        select(
+            Contribution,
+            page.c.rank,
+            func.ts_headline(
+                "english", Contribution.title, ts_query, "HighlightAll=true"
+            ),
+            func.ts_headline(
+                "english",
+                Contribution.description,
+                ts_query,
+                "MaxFragments=2, MaxWords=20, MinWords=5",
+            ),
+        )
+        .join(page, page.c.id == Contribution.id)
+        .order_by(page.c.rank.desc(), Contribution.id)
+        .options(*contribution_short_load_options())
+    )
+    return session.exec(statement).all()
+
+
+def select_dependency_cycle(
+    session: Session, contribution_id: str, dependency_ids: list[str]
+) -> list[str]:
+    """Among `dependency_ids`, the contributions which already depend,
+    directly or transitively, on the given contribution (or are the
+    contribution itself): making it depend on them would close a cycle.
+    Runs as a single recursive query over the dependents of the contribution."""
+    dependents = select(literal(contribution_id).label("id")).cte(
+        "dependents", recursive=True
+    )
+    dependents = dependents.union(
+        select(ContributionDependencyLink.dependent_id).join(
+            dependents, ContributionDependencyLink.dependency_id == dependents.c.id
+        )
+    )
+    statement = select(dependents.c.id).where(dependents.c.id.in_(dependency_ids))
+    return session.exec(statement).all()
+
+
 def update_contribution(
     session: Session, contribution: Contribution, contribution_in: ContributionUpdate
 ) -> Tuple[Contribution, list[Contributor]]:
-
-    contribution_links = [
-        ("tags", contribution.tags, contribution_in.tags, select_tag_by_id),
-        (
-            "dependencies",
-            contribution.dependencies,
-            contribution_in.dependencies,
-            select_contribution_by_id,
-        ),
+    previous_dependency_ids = {
+        dependency.id for dependency in contribution.dependencies
+    }
+    new_dependency_ids = [
+        dependency_id
+        for dependency_id in contribution_in.dependencies
+        if dependency_id not in previous_dependency_ids
     ]
+    if new_dependency_ids:
+        cycle = select_dependency_cycle(session, contribution.id, new_dependency_ids)
+        if cycle:
+            _LOGGER.info(
+                "Dependency cycle", contribution_id=contribution.id, dependencies=cycle
+            )
+            raise ConditionError(
+                condition="Dependency cycle",
+                detail=f"Contributions {', '.join(sorted(cycle))} "
+                "already depend on this contribution",
+            )
 
-    for link in contribution_links:
-        update_links(session, contribution, "contribution", *link)
+    tags, dependencies, new_contributors = select_by_ids(
+        session,
+        (Tag, contribution_in.tags, "Tags with ID"),
+        (Contribution, contribution_in.dependencies, "Dependencies with ID"),
+        (Contributor, contribution_in.contributors, "Contributor ID"),
+    )
+    update_links(session, contribution, "contribution", "tags", contribution.tags, tags)
+    update_links(
+        session,
+        contribution,
+        "contribution",
+        "dependencies",
+        contribution.dependencies,
+        dependencies,
+    )
 
-    # update contributors
-    # delete all existing links
-    for link in contribution.contributors:
+    # update contributors, writing only the links that changed
+    previous_links = {link.contributor_id: link for link in contribution.contributors}
+    for contributor_order, contributor in enumerate(new_contributors):
+        link = previous_links.pop(contributor.id, None)
+        if link is None:
+            contribution_contributor_link = ContributionContributorLink(
+                contribution=contribution,
+                contributor=contributor,
+                contributor_order=contributor_order,
+            )
+            session.add(contribution_contributor_link)
+        elif link.contributor_order != contributor_order:
+            link.contributor_order = contributor_order
+    for link in previous_links.values():
         session.delete(link)
-    # add new links
-    new_contributors = []
-    for contributor_order, contributor_id in enumerate(contribution_in.contributors):
-        contributor = select_contributor_by_id(session, contributor_id)
-        if contributor is None:
-            raise NotFoundError(what=f"Contributor ID {contributor_id}")
-        contribution_contributor_link = ContributionContributorLink(
-            contribution=contribution,
-            contributor=contributor,
-            contributor_order=contributor_order,
-        )
-        new_contributors.append(contributor)
-        session.add(contribution_contributor_link)
 
     update_dict = contribution_in.model_dump(
         exclude={"discord_chat_link", "github_link", "forum_link", "wiki_link", "links"}
@@ -149,15 +608,95 @@ def update_contribution(
     ]
     contribution.sqlmodel_update(update_dict)
     session.commit()
-    session.refresh(contribution)
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
+    contribution = reload_contribution(session, contribution)
     return contribution, new_contributors
 
 
+def select_contribution_lineage(
+    session: Session,
+    contribution_id: str,
+    direction: Literal["ancestors", "descendants"],
+    max_depth: int,
+) -> list[Tuple[Contribution, int]]:
+    """Walk the dependency graph from a contribution in one recursive query.
+    Ancestors are the contributions it transitively depends on, descendants
+    the ones transitively depending on it. Each contribution is returned
+    once, with its shortest distance to the starting contribution."""
+    if direction == "ancestors":
+        source = ContributionDependencyLink.dependent_id
+        target = ContributionDependencyLink.dependency_id
+    else:
+        source = ContributionDependencyLink.dependency_id
+        target = ContributionDependencyLink.dependent_id
+
+    lineage = (
+        select(target.label("id"), literal(1).label("depth"))
+        .where(source == contribution_id)
+        .cte("lineage", recursive=True)
+    )
+    # UNION deduplicates (id, depth) pairs and depth is bounded,
+    # so the walk terminates even on a cyclic graph
+    lineage = lineage.union(
+        select(target, lineage.c.depth + 1)
+        .join(lineage, source == lineage.c.id)
+        .where(lineage.c.depth < max_depth)
+    )
+    depths = (
+        select(lineage.c.id, func.min(lineage.c.depth).label("depth"))
+        .group_by(lineage.c.id)
+        .subquery()
+    )
+    statement = (
+        select(Contribution, depths.c.depth)
+        .join(depths, depths.c.id == Contribution.id)
+        .order_by(depths.c.depth, Contribution.date, Contribution.id)
+    )
+    return session.exec(statement).all()
+
+
+def select_contribution_graph(session: Session) -> ContributionGraph:
+    """The whole dependency graph, as flat node and edge lists."""
+    tag_ids = func.array_remove(
+        func.array_agg(
+            aggregate_order_by(ContributionTagLink.tag_id, ContributionTagLink.tag_id)
+        ),
+        None,
+    )
+    statement = (
+        select(Contribution.id, Contribution.short_title, Contribution.date, tag_ids)
+        .outerjoin(
+            ContributionTagLink, ContributionTagLink.contribution_id == Contribution.id
+        )
+        .group_by(Contribution.id)
+        .order_by(Contribution.date, Contribution.id)
+    )
+    nodes = [
+        ContributionGraphNode(id=id, short_title=short_title, date=date, tag_ids=tags)
+        for id, short_title, date, tags in session.exec(statement).all()
+    ]
+    statement = select(
+        ContributionDependencyLink.dependency_id,
+        ContributionDependencyLink.dependent_id,
+    ).order_by(
+        ContributionDependencyLink.dependency_id,
+        ContributionDependencyLink.dependent_id,
+    )
+    edges = [
+        ContributionGraphEdge(dependency_id=dependency_id, dependent_id=dependent_id)
+        for dependency_id, dependent_id in session.exec(statement).all()
+    ]
+    return ContributionGraph(nodes=nodes, edges=edges)
+
+
 def select_contribution_contributors(
     session: Session, contribution_id: str
 ) -> list[Contributor]:
-    statement = select(ContributionContributorLink).where(
-        ContributionContributorLink.contribution_id == contribution_id
+    statement = (
+        select(ContributionContributorLink)
+        .where(ContributionContributorLink.contribution_id == contribution_id)
+        .order_by(ContributionContributorLink.contributor_order)
+        .options(joinedload(ContributionContributorLink.contributor))
     )
     links = session.exec(statement).all()
     return [link.contributor for link in links]
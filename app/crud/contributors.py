@@ -1,19 +1,52 @@
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence
 
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
 from structlog import get_logger
 
+from app.core.cache import response_cache
 from app.core.exceptions import ConditionError
+from app.crud.utils import (
+    escape_like,
+    next_page_cursor,
+    paginate,
+    select_by_keys,
+    select_in_batches,
+)
 from app.models import (
     Contribution,
     ContributionContributorLink,
     Contributor,
+    ContributorReviewLink,
     ContributorUpsert,
     Review,
 )
 
 _LOGGER = get_logger()
 
+# relationships rendered with a contributor
+CONTRIBUTOR_EMBEDS = frozenset({"contributions", "reviewed_contributions"})
+
+# cached responses rendering contributors
+_INVALIDATED_NAMESPACES = (
+    "contributors",
+    "contributions",
+    "tags",
+    "reviews",
+    "autocomplete",
+)
+
+# violated when a name is already taken: the unique columns of contributor
+# are checked on write, `ContributorName` right after
+_NAME_CONSTRAINTS = frozenset(
+    {
+        "contributor_local_handle_key",
+        "contributor_display_name_key",
+        "contributorname_pkey",
+    }
+)
+
 
 def create_contributor(
     session: Session, contributor_in: ContributorUpsert
@@ -21,7 +54,8 @@ def create_contributor(
     _LOGGER.info("Creating new contributor", contributor=contributor_in)
     db_contributor = Contributor.model_validate(contributor_in)
     session.add(db_contributor)
-    session.commit()
+    _commit_contributor(session, contributor_in)
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(db_contributor)
     _LOGGER.info("Contributor created", contributor_id=db_contributor.id)
     return db_contributor
@@ -31,9 +65,11 @@ def update_contributor(
     session: Session, contributor: Contributor, contributor_in: ContributorUpsert
 ) -> Contributor:
     update_dict = contributor_in.model_dump()
+    contributor_id = contributor.id
     contributor.sqlmodel_update(update_dict)
     session.add(contributor)
-    session.commit()
+    _commit_contributor(session, contributor_in, contributor_id)
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(contributor)
     _LOGGER.info("Contributor updated", contributor_id=contributor.id)
     return contributor
@@ -47,6 +83,86 @@ def select_contributor_by_id(
     return contributor
 
 
+def export_contributors(
+    session: Session, batch_size: int = 500
+) -> Iterator[Sequence[Contributor]]:
+    """Every contributor, by creation date, in batches of `batch_size`."""
+    statement = select(Contributor).order_by(Contributor.created_at, Contributor.id)
+    return select_in_batches(session, statement, batch_size)
+
+
+def select_contributors_by_ids(
+    session: Session,
+    contributor_ids: Optional[list[int]] = None,
+    local_handles: Optional[list[str]] = None,
+) -> tuple[list[Contributor], list]:
+    """The contributors with the given IDs, or local handles, in the requested
+    order, and the IDs or local handles that do not exist."""
+    if local_handles is not None:
+        return select_by_keys(
+            session, select(Contributor), Contributor.local_handle, local_handles
+        )
+    return select_by_keys(
+        session, select(Contributor), Contributor.id, contributor_ids or []
+    )
+
+
+def contributors_page(skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Statement selecting a page of contributors, by creation date."""
+    return paginate(
+        select(Contributor),
+        Contributor.created_at,
+        Contributor.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def select_contributors(
+    session: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> tuple[list[Contributor], str | None]:
+    contributors = session.exec(
+        contributors_page(skip=skip, limit=limit, cursor=cursor)
+    ).all()
+    next_cursor = next_page_cursor(
+        contributors, Contributor.created_at, Contributor.id, limit=limit, cursor=cursor
+    )
+    return contributors, next_cursor
+
+
+def select_contributor_suggestions(
+    session: Session, query: str, limit: int = 10
+) -> list[tuple[int, str]]:
+    """Contributors whose local handle or display name starts with or
+    resembles `query`, prefix matches first. Returns (id, label) pairs."""
+    prefix = escape_like(query) + "%"
+    is_prefix = or_(
+        Contributor.local_handle.ilike(prefix), Contributor.display_name.ilike(prefix)
+    )
+    similarity = func.greatest(
+        func.similarity(Contributor.local_handle, query),
+        func.similarity(Contributor.display_name, query),
+    )
+    label = func.coalesce(Contributor.display_name, Contributor.local_handle)
+    statement = (
+        select(Contributor.id, label)
+        .where(
+            or_(
+                is_prefix,
+                Contributor.local_handle.op("%")(query),
+                Contributor.display_name.op("%")(query),
+            )
+        )
+        .order_by(is_prefix.desc(), similarity.desc(), label)
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+
 def select_contributor_by_local_handle(
     session: Session, local_handle: str
 ) -> Contributor | None:
@@ -60,92 +176,123 @@ def integrity_check_contributor(
     contributor_in: ContributorUpsert,
     contributor_update_id: Optional[int] = None,
 ) -> bool:
-    # check if local handle is used
-    contributor = select_contributor_by_local_handle(
-        session, contributor_in.local_handle
+    # local handles and display names share a namespace, so any contributor
+    # holding one of the requested names in either field is a clash
+    names = {contributor_in.local_handle, contributor_in.display_name} - {None}
+    statement = select(
+        Contributor.id, Contributor.local_handle, Contributor.display_name
+    ).where(
+        or_(Contributor.local_handle.in_(names), Contributor.display_name.in_(names))
     )
-    if (contributor is not None and contributor_update_id is None) or (
-        contributor is not None and contributor.id != contributor_update_id
-    ):
-        _LOGGER.info(
-            "Local handle already exists",
-            local_handle=contributor_in.local_handle,
-            contributor_id=contributor.id,
-        )
-        raise ConditionError(
-            condition="Local handle already exists",
-        )
-    # check if local handle is used as display name
-    statement = select(Contributor).where(
-        Contributor.display_name == contributor_in.local_handle
-    )
-    contributor = session.exec(statement).first()
-    if (contributor is not None and contributor_update_id is None) or (
-        contributor is not None and contributor.id != contributor_update_id
-    ):
-        _LOGGER.info(
-            "Local handle already used as display name",
-            local_handle=contributor_in.local_handle,
-            contributor_id=contributor.id,
-        )
-        raise ConditionError(
-            condition="Local handle already used as display name",
-        )
+    if contributor_update_id is not None:
+        statement = statement.where(Contributor.id != contributor_update_id)
+    clashes = session.exec(statement).all()
 
-    if contributor_in.display_name is not None:
-        # check if display name is used
-        statement = select(Contributor).where(
-            Contributor.display_name == contributor_in.display_name
-        )
-        contributor = session.exec(statement).first()
-        if (contributor is not None and contributor_update_id is None) or (
-            contributor is not None and contributor.id != contributor_update_id
-        ):
-            _LOGGER.info(
-                "Display name already exists",
-                display_name=contributor_in.display_name,
-                contributor_id=contributor.id,
-            )
-            raise ConditionError(
-                condition="Display name already exists",
-            )
-        # check if display name is used as local handle
-        statement = select(Contributor).where(
-            Contributor.local_handle == contributor_in.display_name
-        )
-        contributor = session.exec(statement).first()
-        if (contributor is not None and contributor_update_id is None) or (
-            contributor is not None and contributor.id != contributor_update_id
-        ):
-            _LOGGER.info(
-                "Display name already used as local handle",
-                display_name=contributor_in.display_name,
-                contributor_id=contributor.id,
-            )
-            raise ConditionError(
-                condition="Display name already used as local handle",
-            )
+    checks = [
+        ("Local handle already exists", "local_handle", "local_handle"),
+        ("Local handle already used as display name", "local_handle", "display_name"),
+        ("Display name already exists", "display_name", "display_name"),
+        ("Display name already used as local handle", "display_name", "local_handle"),
+    ]
+    for condition, field, clashing_field in checks:
+        value = getattr(contributor_in, field)
+        for contributor in clashes:
+            if value is not None and getattr(contributor, clashing_field) == value:
+                _LOGGER.info(condition, **{field: value}, contributor_id=contributor.id)
+                raise ConditionError(condition=condition)
     return True
 
 
+def _commit_contributor(
+    session: Session,
+    contributor_in: ContributorUpsert,
+    contributor_update_id: Optional[int] = None,
+) -> None:
+    """Commit a contributor write, turning a name clash caught by the database,
+    e.g. a concurrent write taking the same name, into the ConditionError
+    `integrity_check_contributor` would have raised. Other integrity errors
+    are raised as is."""
+    try:
+        session.commit()
+    except IntegrityError as exc:
+        session.rollback()
+        diag = getattr(exc.orig, "diag", None)
+        if getattr(diag, "constraint_name", None) not in _NAME_CONSTRAINTS:
+            raise
+        integrity_check_contributor(session, contributor_in, contributor_update_id)
+        raise ConditionError(condition="Name already in use") from exc
+
+
+def _reviewed_contributions(contributor_id: int):
+    """Statement selecting the contributions reviewed by a contributor, once
+    each whatever the number of reviews. DISTINCT ON, as `links` is JSON,
+    which has no equality."""
+    return (
+        select(Contribution)
+        .join(Review, Review.contribution_id == Contribution.id)
+        .join(ContributorReviewLink, ContributorReviewLink.review_id == Review.id)
+        .where(ContributorReviewLink.contributor_id == contributor_id)
+        .distinct(Contribution.date, Contribution.id)
+    )
+
+
 def select_contributor_reviewed_contributions(
     session: Session, contributor_id: int
 ) -> list[Contribution]:
-    statement = select(Review).where(
-        Review.reviewers.any(Contributor.id == contributor_id)
+    """Every contribution reviewed by a contributor, by date, in a single query."""
+    statement = _reviewed_contributions(contributor_id).order_by(
+        Contribution.date, Contribution.id
     )
-    reviews = session.exec(statement).all()
-    contribution_ids = [review.contribution_id for review in reviews]
-    statement = select(Contribution).where(Contribution.id.in_(contribution_ids))
-    contributions = session.exec(statement).all()
-    return contributions
+    return list(session.exec(statement).all())
+
+
+def select_contributor_reviewed_contributions_page(
+    session: Session,
+    contributor_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> tuple[list[Contribution], str | None]:
+    """A page of the contributions reviewed by a contributor, by date."""
+    statement = paginate(
+        _reviewed_contributions(contributor_id),
+        Contribution.date,
+        Contribution.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+    contributions = list(session.exec(statement).all())
+    next_cursor = next_page_cursor(
+        contributions, Contribution.date, Contribution.id, limit=limit, cursor=cursor
+    )
+    return contributions, next_cursor
 
 
 def select_contributor_contributions(
     session: Session, contributor_id: int
 ) -> list[Contribution]:
-    statement = select(ContributionContributorLink).where(
-        ContributionContributorLink.contributor_id == contributor_id
+    return select_contributors_contributions(session, [contributor_id])[contributor_id]
+
+
+def select_contributors_contributions(
+    session: Session, contributor_ids: Iterable[int]
+) -> dict[int, list[Contribution]]:
+    """Contributions of each of the contributors, by date, in a single query."""
+    contributions: dict[int, list[Contribution]] = {
+        contributor_id: [] for contributor_id in contributor_ids
+    }
+    if not contributions:
+        return contributions
+    statement = (
+        select(ContributionContributorLink.contributor_id, Contribution)
+        .join(
+            Contribution,
+            Contribution.id == ContributionContributorLink.contribution_id,
+        )
+        .where(ContributionContributorLink.contributor_id.in_(contributions))
+        .order_by(Contribution.date, Contribution.id)
     )
-    links = session.exec(statement).all()
-    return [link.contribution for link in links]
+    for contributor_id, contribution in session.exec(statement).all():
+        contributions[contributor_id].append(contribution)
+    return contributions
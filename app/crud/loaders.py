@@ -0,0 +1,138 @@
+from collections import defaultdict
+from typing import Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import Session, select
+
+from app.models import (
+    Contribution,
+    ContributionContributorLink,
+    ContributionDependencyLink,
+    ContributionTagLink,
+    Contributor,
+    Review,
+    Tag,
+)
+
+_LOADER_KEY = "contribution_loader"
+
+
+class ContributionLoader:
+    """Loads the relationships rendered with contributions in batches, and
+    remembers them by contribution ID for the lifetime of a session, that is a
+    request. Relationships already loaded on an instance, by eager loading
+    options, are used as they are.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+        self._loaded: dict[str, dict[str, list]] = {
+            "contributors": {},
+            "tags": {},
+            "reviews": {},
+            "dependencies": {},
+        }
+
+    def prime(
+        self, contributions: Iterable[Contribution], relationships: Iterable[str]
+    ) -> None:
+        """Fetch `relationships` for every contribution not seen yet, one
+        query per relationship."""
+        contributions = list(contributions)
+        for relationship in relationships:
+            loaded = self._loaded[relationship]
+            missing = {
+                contribution.id
+                for contribution in contributions
+                if contribution.id not in loaded
+                and _instance_value(contribution, relationship) is None
+            }
+            if missing:
+                loaded.update(dict.fromkeys(missing, []))
+                loaded.update(self._fetch(relationship, missing))
+
+    def load(self, contribution: Contribution, relationship: str) -> list:
+        """The `relationship` of a contribution, from the instance if loaded."""
+        value = _instance_value(contribution, relationship)
+        if value is not None:
+            return value
+        self.prime([contribution], [relationship])
+        return self._loaded[relationship][contribution.id]
+
+    def clear(self) -> None:
+        for loaded in self._loaded.values():
+            loaded.clear()
+
+    def _fetch(self, relationship: str, contribution_ids: set[str]) -> dict:
+        if relationship == "contributors":
+            statement = (
+                select(ContributionContributorLink.contribution_id, Contributor)
+                .join(
+                    Contributor,
+                    Contributor.id == ContributionContributorLink.contributor_id,
+                )
+                .where(
+                    ContributionContributorLink.contribution_id.in_(contribution_ids)
+                )
+                .order_by(ContributionContributorLink.contributor_order)
+            )
+        elif relationship == "tags":
+            statement = (
+                select(ContributionTagLink.contribution_id, Tag)
+                .join(Tag, Tag.id == ContributionTagLink.tag_id)
+                .where(ContributionTagLink.contribution_id.in_(contribution_ids))
+                .order_by(Tag.id)
+            )
+        elif relationship == "reviews":
+            statement = (
+                select(Review.contribution_id, Review)
+                .where(Review.contribution_id.in_(contribution_ids))
+                .order_by(Review.id)
+            )
+        else:
+            statement = (
+                select(ContributionDependencyLink.dependent_id, Contribution)
+                .join(
+                    Contribution,
+                    Contribution.id == ContributionDependencyLink.dependency_id,
+                )
+                .where(ContributionDependencyLink.dependent_id.in_(contribution_ids))
+                .order_by(Contribution.id)
+            )
+        rows = defaultdict(list)
+        for contribution_id, row in self.session.exec(statement).all():
+            rows[contribution_id].append(row)
+        return rows
+
+
+def contribution_loader(session: Session) -> ContributionLoader:
+    """The loader of the session, created on first use."""
+    loader = session.info.get(_LOADER_KEY)
+    if loader is None:
+        loader = session.info[_LOADER_KEY] = ContributionLoader(session)
+    return loader
+
+
+def _instance_value(contribution: Contribution, relationship: str) -> list | None:
+    """The `relationship` of a contribution if it is loaded, without querying.
+    Contributors are rendered through their links, which must carry the
+    contributor too."""
+    if relationship in inspect(contribution).unloaded:
+        return None
+    value = getattr(contribution, relationship)
+    if relationship == "contributors":
+        if any("contributor" in inspect(link).unloaded for link in value):
+            return None
+        return [link.contributor for link in value]
+    return value
+
+
+@event.listens_for(ORMSession, "after_commit")
+@event.listens_for(ORMSession, "after_rollback")
+def _clear_contribution_loader(session: ORMSession) -> None:
+    # committed rows are expired and may have changed. Async sessions run on
+    # a plain SQLAlchemy session, hence the listener on the base class
+    loader = session.info.get(_LOADER_KEY)
+    if loader is not None:
+        loader.clear()
@@ -1,14 +1,24 @@
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from structlog import get_logger
 
-from app.core.exceptions import NotFoundError
-from app.crud.contributions import select_contribution_by_id
-from app.crud.contributors import select_contributor_by_id
-from app.crud.utils import update_links
-from app.models import Review, ReviewCreate, ReviewUpdate
+from app.core.cache import response_cache
+from app.crud.utils import (
+    next_page_cursor,
+    paginate,
+    select_by_ids,
+    select_in_batches,
+    update_links,
+)
+from app.models import Contribution, Contributor, Review, ReviewCreate, ReviewUpdate
 
 _LOGGER = get_logger()
 
+# cached responses rendering reviews
+_INVALIDATED_NAMESPACES = ("reviews", "contributions", "contributors", "tags")
+
 
 def select_review_by_id(session: Session, review_id: int) -> Review | None:
     statement = select(Review).where(Review.id == review_id)
@@ -16,17 +26,50 @@ def select_review_by_id(session: Session, review_id: int) -> Review | None:
     return review
 
 
+def export_reviews(
+    session: Session, batch_size: int = 500
+) -> Iterator[Sequence[Review]]:
+    """Every review, by creation date, in batches of `batch_size`."""
+    statement = (
+        select(Review)
+        .order_by(Review.created_at, Review.id)
+        .options(selectinload(Review.reviewers))
+    )
+    return select_in_batches(session, statement, batch_size)
+
+
+def reviews_page(skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Statement selecting a page of reviews, by creation date."""
+    return paginate(
+        select(Review),
+        Review.created_at,
+        Review.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def select_reviews(
+    session: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> tuple[list[Review], str | None]:
+    reviews = session.exec(reviews_page(skip=skip, limit=limit, cursor=cursor)).all()
+    next_cursor = next_page_cursor(
+        reviews, Review.created_at, Review.id, limit=limit, cursor=cursor
+    )
+    return reviews, next_cursor
+
+
 def create_review(session: Session, review_in: ReviewCreate) -> Review:
     _LOGGER.info("Creating new review")
-    contribution = select_contribution_by_id(session, review_in.contribution_id)
-    if contribution is None:
-        raise NotFoundError(what=f"Contribution ID {review_in.contribution_id}")
-    reviewers = []
-    for reviewer_id in review_in.reviewers:
-        reviewer = select_contributor_by_id(session, reviewer_id)
-        if reviewer is None:
-            raise NotFoundError(what=f"Reviewer ID {reviewer_id}")
-        reviewers.append(reviewer)
+    [contribution], reviewers = select_by_ids(
+        session,
+        (Contribution, [review_in.contribution_id], "Contribution ID"),
+        (Contributor, review_in.reviewers, "Reviewer ID"),
+    )
 
     db_review = Review(
         contribution_id=contribution.id,
@@ -36,23 +79,28 @@ def create_review(session: Session, review_in: ReviewCreate) -> Review:
     )
     session.add(db_review)
     session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(db_review)
     _LOGGER.info("Review created", review_id=db_review.id)
     return db_review
 
 
 def update_review(session: Session, review: Review, review_in: ReviewUpdate):
-    review_link = (
-        "reviewers",
-        review.reviewers,
-        review_in.reviewers,
-        select_contributor_by_id,
+    [reviewers] = select_by_ids(
+        session, (Contributor, review_in.reviewers, "Reviewers with ID")
     )
-    update_links(session, review, "review", *review_link)
+    update_links(session, review, "review", "reviewers", review.reviewers, reviewers)
 
     update_dict = review_in.model_dump(exclude={"link"})
     update_dict["link"] = str(review_in.link) if review_in.link else None
     review.sqlmodel_update(update_dict)
     session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(review)
     return review
+
+
+def delete_review(session: Session, review: Review) -> None:
+    session.delete(review)
+    session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
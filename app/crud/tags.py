@@ -1,18 +1,37 @@
-from typing import Optional, Union
+from typing import Iterable, Iterator, Optional, Sequence, Union
 
+from sqlalchemy import func, or_
 from sqlmodel import Session, select
 from structlog import get_logger
 
+from app.core.cache import response_cache
 from app.core.exceptions import ConditionError
-from app.models import Tag, TagCreate, TagUpdate
+from app.crud.contributions import contribution_short_load_options
+from app.crud.utils import (
+    escape_like,
+    next_page_cursor,
+    paginate,
+    select_in_batches,
+)
+from app.models import Contribution, ContributionTagLink, Tag, TagCreate, TagUpdate
 
 _LOGGER = get_logger()
 
+# cached responses rendering tags
+_INVALIDATED_NAMESPACES = (
+    "tags",
+    "contributions",
+    "contributors",
+    "graph",
+    "autocomplete",
+)
+
 
 def create_tag(session: Session, tag: TagCreate) -> Tag:
     db_tag = Tag.model_validate(tag)
     session.add(db_tag)
     session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(db_tag)
     return db_tag
 
@@ -23,15 +42,124 @@ def select_tag_by_id(session: Session, tag_id: int) -> Tag | None:
     return tag
 
 
+def export_tags(session: Session, batch_size: int = 500) -> Iterator[Sequence[Tag]]:
+    """Every tag, by creation date, in batches of `batch_size`."""
+    statement = select(Tag).order_by(Tag.created_at, Tag.id)
+    return select_in_batches(session, statement, batch_size)
+
+
+def tags_page(skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Statement selecting a page of tags, by creation date."""
+    return paginate(
+        select(Tag),
+        Tag.created_at,
+        Tag.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def select_tags(
+    session: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> tuple[list[Tag], str | None]:
+    tags = session.exec(tags_page(skip=skip, limit=limit, cursor=cursor)).all()
+    next_cursor = next_page_cursor(
+        tags, Tag.created_at, Tag.id, limit=limit, cursor=cursor
+    )
+    return tags, next_cursor
+
+
+def tag_contributions_page(
+    tag_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+):
+    """Statement selecting a page of the contributions of a tag, by date."""
+    return paginate(
+        select(Contribution)
+        .join(
+            ContributionTagLink, ContributionTagLink.contribution_id == Contribution.id
+        )
+        .where(ContributionTagLink.tag_id == tag_id),
+        Contribution.date,
+        Contribution.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+    )
+
+
+def select_tag_contributions(
+    session: Session,
+    tag_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> tuple[list[Contribution], str | None]:
+    """A page of the contributions of a tag, along with everything rendered by
+    `ContributionShort`, in a fixed number of queries."""
+    statement = tag_contributions_page(
+        tag_id, skip=skip, limit=limit, cursor=cursor
+    ).options(*contribution_short_load_options())
+    contributions = list(session.exec(statement).all())
+    next_cursor = next_page_cursor(
+        contributions, Contribution.date, Contribution.id, limit=limit, cursor=cursor
+    )
+    return contributions, next_cursor
+
+
+def select_tags_contribution_counts(
+    session: Session, tag_ids: Iterable[int]
+) -> dict[int, int]:
+    """Number of contributions of each of the tags, in a single query."""
+    counts = dict.fromkeys(tag_ids, 0)
+    if counts:
+        statement = (
+            select(ContributionTagLink.tag_id, func.count())
+            .where(ContributionTagLink.tag_id.in_(counts))
+            .group_by(ContributionTagLink.tag_id)
+        )
+        counts.update(session.exec(statement).all())
+    return counts
+
+
+def select_tag_suggestions(
+    session: Session, query: str, limit: int = 10
+) -> list[tuple[int, str]]:
+    """Tags whose display name starts with or resembles `query`, prefix
+    matches first. Returns (id, label) pairs."""
+    is_prefix = Tag.display_name.ilike(escape_like(query) + "%")
+    statement = (
+        select(Tag.id, Tag.display_name)
+        .where(or_(is_prefix, Tag.display_name.op("%")(query)))
+        .order_by(
+            is_prefix.desc(),
+            func.similarity(Tag.display_name, query).desc(),
+            Tag.display_name,
+        )
+        .limit(limit)
+    )
+    return session.exec(statement).all()
+
+
 def update_tag(session: Session, tag: Tag, tag_in: TagUpdate) -> Tag:
     tag_dict = tag_in.model_dump()
     tag.sqlmodel_update(tag_dict)
     session.add(tag)
     session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
     session.refresh(tag)
     return tag
 
 
+def delete_tag(session: Session, tag: Tag) -> None:
+    session.delete(tag)
+    session.commit()
+    response_cache.invalidate(*_INVALIDATED_NAMESPACES)
+
+
 def integrity_check_tag(
     session: Session,
     tag_in: Union[TagCreate, TagUpdate],
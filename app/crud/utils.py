@@ -1,55 +1,191 @@
-from sqlmodel import Session
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from fastapi import status
+from sqlalchemy import DateTime, tuple_
+from sqlmodel import Session, select
 from structlog import get_logger
 
-from app.core.exceptions import NotFoundError
+from app.core.exceptions import ConditionError, NotFoundError
 
 _LOGGER = get_logger()
 
 
+def select_by_ids(session: Session, *lookups) -> list[list]:
+    """Load the rows requested by each `(model, ids, what)` lookup.
+
+    Each model is loaded with a single IN query, and the rows are returned in
+    the requested order. Every missing ID, of every lookup, is reported in
+    one NotFoundError, as `what` followed by the ID, e.g. "Tag ID 3".
+    """
+    results = []
+    missing = []
+    for model, ids, what in lookups:
+        rows = {}
+        if ids:
+            statement = select(model).where(model.id.in_(set(ids)))
+            rows = {row.id: row for row in session.exec(statement).all()}
+        missing.extend(f"{what} {id}" for id in dict.fromkeys(ids) if id not in rows)
+        results.append([rows[id] for id in ids if id in rows])
+    if missing:
+        raise NotFoundError(what=", ".join(missing))
+    return results
+
+
 def update_links(
     session: Session,
     obj,
     obj_name: str,
     link_name: str,
     previous_links,
-    new_links_ids,
-    select_function,
+    new_links,
 ):
-    """Don't forget to commit the session after calling this function!"""
-    previous_links_ids = [link.id for link in previous_links]
-    for link_in_id in new_links_ids:
-        if link_in_id not in previous_links_ids:
-            link = select_function(session, link_in_id)
-            if link is None:
-                raise NotFoundError(
-                    what=f"{link_name.capitalize()} with ID {link_in_id}"
-                )
-            _LOGGER.debug(
-                f"Adding {link_name[:-1]} to {obj_name}.",
-                link_id=link_in_id,
-                contribution_id=obj.id,
-            )
+    """Make `previous_links` hold `new_links`, rows loaded by `select_by_ids`.
+
+    Don't forget to commit the session after calling this function!"""
+    previous_links_ids = {link.id for link in previous_links}
+    new_links_ids = {link.id for link in new_links}
+    for link in new_links:
+        if link.id not in previous_links_ids:
             previous_links.append(link)
+            previous_links_ids.add(link.id)
             _LOGGER.debug(
-                f"{link_name[:-1].capitalize()} added.",
-                link_id=link_in_id,
-                contribution_id=obj.id,
-            )
-    for link_id in previous_links_ids:
-        if link_id not in new_links_ids:
-            link = select_function(session, link_id)
-            if link is None:
-                raise NotFoundError(what=f"{link_name.capitalize()} with ID {link_id}")
-            previous_links.remove(link)
-            _LOGGER.debug(
-                f"Removing {link_name[:-1]} from {obj_name}.",
-                link_id=link.id,
-                contribution_id=obj.id,
-            )
-            _LOGGER.debug(
-                f"{link_name[:-1].capitalize()} removed.",
+                f"{link_name[:-1].capitalize()} added to {obj_name}.",
                 link_id=link.id,
                 contribution_id=obj.id,
             )
+    for link in [link for link in previous_links if link.id not in new_links_ids]:
+        previous_links.remove(link)
+        _LOGGER.debug(
+            f"{link_name[:-1].capitalize()} removed from {obj_name}.",
+            link_id=link.id,
+            contribution_id=obj.id,
+        )
 
     session.add(obj)
+
+
+def select_by_keys(session: Session, statement, key_column, keys: list) -> tuple:
+    """Rows of `statement` whose `key_column` is in `keys`, in a single query.
+
+    Returns the rows in the order of `keys`, duplicates dropped, and the keys
+    that matched no row.
+    """
+    keys = list(dict.fromkeys(keys))
+    rows = {}
+    if keys:
+        for row in session.exec(statement.where(key_column.in_(keys))).all():
+            rows[getattr(row, key_column.key)] = row
+    return [rows[key] for key in keys if key in rows], [
+        key for key in keys if key not in rows
+    ]
+
+
+def select_existing_ids(session: Session, id_column, ids: Iterable) -> set:
+    """The subset of `ids` present in `id_column`, in a single query."""
+    ids = set(ids)
+    if not ids:
+        return set()
+    statement = select(id_column).where(id_column.in_(ids))
+    return set(session.exec(statement).all())
+
+
+def select_in_batches(
+    session: Session, statement, batch_size: int
+) -> Iterator[Sequence]:
+    """Rows of `statement` in lists of `batch_size`. Rows are fetched from a
+    server-side cursor, so only one batch is held in memory at a time."""
+    result = session.exec(statement.execution_options(yield_per=batch_size))
+    yield from result.partitions()
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of a row into an opaque, URL-safe cursor."""
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    python_type = column.type.python_type
+    if python_type is float and isinstance(value, int):
+        python_type = int
+    # bool is an int, but never a valid integer key
+    if not isinstance(value, python_type) or (
+        isinstance(value, bool) and python_type is not bool
+    ):
+        raise TypeError(value)
+    return value
+
+
+def decode_cursor(cursor: str, *columns) -> list[Any]:
+    """Decode a cursor produced by `encode_cursor` for the given sort columns."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError(cursor)
+        return [
+            _decode_cursor_value(column, value)
+            for column, value in zip(columns, payload)
+        ]
+    except (binascii.Error, ValueError, TypeError) as exc:
+        raise ConditionError(
+            condition="Invalid cursor", status_code=status.HTTP_400_BAD_REQUEST
+        ) from exc
+
+
+def paginate(
+    statement,
+    sort_column,
+    id_column,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+):
+    """Restrict `statement` to one page, ordered by `(sort_column, id_column)`.
+
+    Without a cursor, the page is selected with OFFSET/LIMIT. With a cursor
+    (an empty string requests the first page), rows are selected with a
+    keyset predicate on the sort key, so any page is served by an index
+    range scan whatever its depth.
+    """
+    if descending:
+        statement = statement.order_by(sort_column.desc(), id_column.desc())
+    else:
+        statement = statement.order_by(sort_column, id_column)
+
+    if cursor is None:
+        return statement.offset(skip).limit(limit)
+
+    if cursor:
+        key = tuple_(*decode_cursor(cursor, sort_column, id_column))
+        if descending:
+            statement = statement.where(tuple_(sort_column, id_column) < key)
+        else:
+            statement = statement.where(tuple_(sort_column, id_column) > key)
+    return statement.limit(limit)
+
+
+def next_page_cursor(
+    rows, sort_column, id_column, limit: int, cursor: Optional[str]
+) -> str | None:
+    """Cursor of the page following `rows`, a page selected by `paginate`.
+    None on the last page, or when paginating without a cursor."""
+    if cursor is None or not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so that `value` is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,167 @@
+"""
+Fingerprints of the rows rendered by the read routes, used as ETags.
+
+Each fingerprint is computed by a single query hashing the IDs and
+`updated_at` of every row a response embeds, link rows included, so that it
+changes whenever the rendered payload may change.
+"""
+
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Select, func, literal, literal_column, union, union_all
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlmodel import Session, select
+
+from app.models import (
+    Contribution,
+    ContributionContributorLink,
+    ContributionDependencyLink,
+    ContributionTagLink,
+    Contributor,
+    ContributorReviewLink,
+    Review,
+    Tag,
+)
+
+# a list of IDs, or a statement selecting them
+Ids = Union[Iterable, Select]
+
+
+def _key(kind: str, *columns):
+    return func.concat_ws(":", literal(kind), *columns).label("key")
+
+
+def _select_version(session: Session, statements: list[Select]) -> str | None:
+    """Hash of the keys selected by `statements`, None if there are none."""
+    keys = union_all(*statements).subquery()
+    statement = select(
+        func.md5(
+            func.string_agg(
+                keys.c.key, aggregate_order_by(literal_column("','"), keys.c.key)
+            )
+        )
+    )
+    return session.exec(statement).one()
+
+
+def _contribution_keys(contribution_ids: Ids) -> list[Select]:
+    # dependencies are rendered too, along with their own attributes
+    rendered = union(
+        select(Contribution.id).where(Contribution.id.in_(contribution_ids)),
+        select(ContributionDependencyLink.dependency_id).where(
+            ContributionDependencyLink.dependent_id.in_(contribution_ids)
+        ),
+    ).subquery()
+    ids = select(rendered.c.id)
+    return [
+        select(_key("contribution", Contribution.id, Contribution.updated_at)).where(
+            Contribution.id.in_(ids)
+        ),
+        select(
+            _key(
+                "contributor",
+                ContributionContributorLink.contribution_id,
+                ContributionContributorLink.contributor_order,
+                Contributor.id,
+                Contributor.updated_at,
+            )
+        )
+        .join(Contributor, Contributor.id == ContributionContributorLink.contributor_id)
+        .where(ContributionContributorLink.contribution_id.in_(ids)),
+        select(_key("tag", ContributionTagLink.contribution_id, Tag.id, Tag.updated_at))
+        .join(Tag, Tag.id == ContributionTagLink.tag_id)
+        .where(ContributionTagLink.contribution_id.in_(ids)),
+        select(
+            _key("review", Review.contribution_id, Review.id, Review.updated_at)
+        ).where(Review.contribution_id.in_(ids)),
+        select(
+            _key(
+                "reviewer",
+                ContributorReviewLink.review_id,
+                Contributor.id,
+                Contributor.updated_at,
+            )
+        )
+        .join(Contributor, Contributor.id == ContributorReviewLink.contributor_id)
+        .join(Review, Review.id == ContributorReviewLink.review_id)
+        .where(Review.contribution_id.in_(ids)),
+        select(
+            _key(
+                "dependency",
+                ContributionDependencyLink.dependent_id,
+                Contribution.id,
+                Contribution.updated_at,
+            )
+        )
+        .join(Contribution, Contribution.id == ContributionDependencyLink.dependency_id)
+        .where(ContributionDependencyLink.dependent_id.in_(ids)),
+    ]
+
+
+def select_contributions_version(session: Session, contribution_ids: Ids) -> str | None:
+    """Version of contributions rendered with their attributes.
+    None if none of the contributions exist."""
+    return _select_version(session, _contribution_keys(contribution_ids))
+
+
+def select_contributors_version(
+    session: Session,
+    contributor_ids: Ids,
+    with_reviewed_contributions: bool = False,
+) -> str | None:
+    """Version of contributors rendered with their contributions, and their
+    reviewed contributions if asked. None if none of the contributors exist."""
+    contribution_ids = select(ContributionContributorLink.contribution_id).where(
+        ContributionContributorLink.contributor_id.in_(contributor_ids)
+    )
+    if with_reviewed_contributions:
+        contribution_ids = union(
+            contribution_ids,
+            select(Review.contribution_id)
+            .join(ContributorReviewLink, ContributorReviewLink.review_id == Review.id)
+            .where(ContributorReviewLink.contributor_id.in_(contributor_ids)),
+        )
+    statements = [
+        select(_key("contributor", Contributor.id, Contributor.updated_at)).where(
+            Contributor.id.in_(contributor_ids)
+        ),
+        *_contribution_keys(contribution_ids),
+    ]
+    return _select_version(session, statements)
+
+
+def select_tags_version(
+    session: Session, tag_ids: Ids, contribution_ids: Optional[Ids] = None
+) -> str | None:
+    """Version of tags and their contribution counts, rendered with the given
+    contributions if any. None if none of the tags exist."""
+    statements = [
+        select(_key("tag", Tag.id, Tag.updated_at)).where(Tag.id.in_(tag_ids)),
+        select(_key("tag_contributions", ContributionTagLink.tag_id, func.count()))
+        .where(ContributionTagLink.tag_id.in_(tag_ids))
+        .group_by(ContributionTagLink.tag_id),
+    ]
+    if contribution_ids is not None:
+        statements.extend(_contribution_keys(contribution_ids))
+    return _select_version(session, statements)
+
+
+def select_reviews_version(session: Session, review_ids: Ids) -> str | None:
+    """Version of reviews rendered with their reviewers.
+    None if none of the reviews exist."""
+    statements = [
+        select(_key("review", Review.id, Review.updated_at)).where(
+            Review.id.in_(review_ids)
+        ),
+        select(
+            _key(
+                "reviewer",
+                ContributorReviewLink.review_id,
+                Contributor.id,
+                Contributor.updated_at,
+            )
+        )
+        .join(Contributor, Contributor.id == ContributorReviewLink.contributor_id)
+        .where(ContributorReviewLink.review_id.in_(review_ids)),
+    ]
+    return _select_version(session, statements)
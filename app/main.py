@@ -3,7 +3,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from structlog import get_logger
 
-from app.api.routes import contributions, contributors, reviews, tags
+from app.api.deps import MISSING_IDS_HEADER, NEXT_CURSOR_HEADER
+from app.api.middleware import ResponseCacheMiddleware
+from app.api.routes import (
+    autocomplete,
+    contributions,
+    contributors,
+    export,
+    graph,
+    metrics,
+    reviews,
+    tags,
+)
+from app.core.cache import response_cache
 from app.core.config import settings
 
 _LOGGER = get_logger()
@@ -25,6 +37,19 @@ if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
 _LOGGER.info("Creating FastAPI app", settings=settings)
 app = FastAPI()
 
+app.add_middleware(
+    ResponseCacheMiddleware,
+    cache=response_cache,
+    namespaces={
+        "contributions",
+        "contributors",
+        "tags",
+        "reviews",
+        "graph",
+        "autocomplete",
+    },
+)
+
 origins = ["*"]
 
 app.add_middleware(
@@ -33,12 +58,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, MISSING_IDS_HEADER, "ETag"],
 )
 
 app.include_router(contributors.router, tags=["Contributors"])
 app.include_router(contributions.router, tags=["Contributions"])
 app.include_router(tags.router, tags=["Tags"])
 app.include_router(reviews.router, tags=["Reviews"])
+app.include_router(autocomplete.router, tags=["Autocomplete"])
+app.include_router(graph.router, tags=["Graph"])
+app.include_router(export.router, tags=["Export"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 
 @app.get("/sentry-debug")
@@ -1,27 +1,77 @@
 from datetime import datetime
-from typing import Dict, Optional
+from itertools import chain
+from typing import Dict, Iterable, Optional, Sequence
 
 from pydantic import HttpUrl, field_validator
-from sqlalchemy.sql import func
+from sqlalchemy import DDL, ForeignKey, Integer, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.schema import Computed
+from sqlalchemy.sql import func, text
 from sqlalchemy.sql.sqltypes import JSON, DateTime
-from sqlmodel import Column, Field, Relationship, Session, SQLModel
+from sqlmodel import Column, Field, Index, Relationship, Session, SQLModel
+from structlog import get_logger
 
 from app import crud
 
+_LOGGER = get_logger()
+
+# trigram indexes require the pg_trgm extension
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
 
 # Generic message
 class Message(SQLModel):
     message: str
 
 
+class ResponseCacheStats(SQLModel):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class PoolWaitBucket(SQLModel):
+    le: float
+    count: int
+
+
+class PoolStats(SQLModel):
+    name: str
+    pool: str
+    size: int | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    wait_count: int
+    wait_sum: float
+    wait_buckets: list[PoolWaitBucket]
+
+
+class AutocompleteItem(SQLModel):
+    id: int
+    label: str
+
+
 class ContributionContributorLink(SQLModel, table=True):
-    # __table_args__ = (
-    #     UniqueConstraint(
-    #         "contribution_id",
-    #         "contributor_order",
-    #         name="contributor_order_constraint"
-    #     ),
-    # )
+    __table_args__ = (
+        # UniqueConstraint(
+        #     "contribution_id",
+        #     "contributor_order",
+        #     name="contributor_order_constraint"
+        # ),
+        Index(
+            "ix_contributioncontributorlink_contributor_id_contribution_id",
+            "contributor_id",
+            "contribution_id",
+        ),
+    )
 
     contribution_id: str | None = Field(
         default=None, foreign_key="contribution.id", primary_key=True
@@ -36,6 +86,12 @@ class ContributionContributorLink(SQLModel, table=True):
 
 
 class ContributionTagLink(SQLModel, table=True):
+    __table_args__ = (
+        Index(
+            "ix_contributiontaglink_tag_id_contribution_id", "tag_id", "contribution_id"
+        ),
+    )
+
     contribution_id: str | None = Field(
         default=None, foreign_key="contribution.id", primary_key=True
     )
@@ -52,6 +108,15 @@ class ContributorReviewLink(SQLModel, table=True):
 
 
 class ContributionDependencyLink(SQLModel, table=True):
+    # the primary key serves lookups by dependency_id, this index the reverse
+    __table_args__ = (
+        Index(
+            "ix_contributiondependencylink_dependent_id_dependency_id",
+            "dependent_id",
+            "dependency_id",
+        ),
+    )
+
     dependency_id: str | None = Field(
         default=None, foreign_key="contribution.id", primary_key=True
     )
@@ -91,6 +156,22 @@ class ContributorUpsert(ContributorBase):
 
 
 class Contributor(ContributorBase, table=True):
+    __table_args__ = (
+        Index("ix_contributor_created_at_id", "created_at", "id"),
+        Index(
+            "ix_contributor_local_handle_trgm",
+            "local_handle",
+            postgresql_using="gin",
+            postgresql_ops={"local_handle": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_contributor_display_name_trgm",
+            "display_name",
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime | None = Field(
         default=None,
@@ -116,12 +197,94 @@ class Contributor(ContributorBase, table=True):
     )
 
 
+class ContributorName(SQLModel, table=True):
+    """Names taken by contributors, local handles and display names alike.
+
+    Filled by a trigger on the contributor table: the primary key keeps a
+    name from being used by two contributors, whichever field holds it.
+    Names of the contributors already there when the table is created are
+    registered with it, the oldest contributor keeping a shared name.
+    """
+
+    name: str = Field(primary_key=True)
+    contributor_id: int = Field(
+        sa_column=Column(
+            Integer,
+            ForeignKey("contributor.id", ondelete="CASCADE"),
+            nullable=False,
+            index=True,
+        )
+    )
+
+
+event.listen(
+    ContributorName.__table__,
+    "after_create",
+    DDL(
+        """
+        CREATE OR REPLACE FUNCTION contributor_register_names() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                DELETE FROM contributorname WHERE contributor_id = NEW.id;
+            END IF;
+            INSERT INTO contributorname (name, contributor_id)
+            SELECT DISTINCT name, NEW.id
+            FROM (VALUES (NEW.local_handle), (NEW.display_name)) AS names(name)
+            WHERE name IS NOT NULL;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS contributor_register_names ON contributor;
+        CREATE TRIGGER contributor_register_names
+        AFTER INSERT OR UPDATE OF local_handle, display_name ON contributor
+        FOR EACH ROW EXECUTE FUNCTION contributor_register_names();
+
+        INSERT INTO contributorname (name, contributor_id)
+        SELECT name, id
+        FROM contributor, LATERAL (VALUES (local_handle), (display_name)) AS names(name)
+        WHERE name IS NOT NULL
+        ORDER BY id
+        ON CONFLICT DO NOTHING;
+        """
+    ),
+)
+
+
+@event.listens_for(ContributorName.__table__, "after_create")
+def _report_shared_names(target, connection, **kw) -> None:
+    """Log the names held by several existing contributors, only the oldest of
+    which got registered."""
+    clashes = connection.execute(
+        text(
+            """
+            SELECT name, array_agg(DISTINCT id ORDER BY id)
+            FROM contributor,
+                LATERAL (VALUES (local_handle), (display_name)) AS names(name)
+            WHERE name IS NOT NULL
+            GROUP BY name
+            HAVING count(DISTINCT id) > 1
+            """
+        )
+    ).all()
+    for name, contributor_ids in clashes:
+        _LOGGER.warning(
+            "Contributor name shared", name=name, contributor_ids=contributor_ids
+        )
+
+
 class ContributorShort(SQLModel):
     id: int
     local_handle: str
     display_name: str | None = None
 
 
+class ContributorPublic(ContributorBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+
 class ContributorWithAttributesShortPublic(ContributorBase):
     """Public view of a contributor, including contributions.
     Used to display all contributors."""
@@ -132,17 +295,44 @@ class ContributorWithAttributesShortPublic(ContributorBase):
     contributions: list["ContributionShort"] = []
 
     @classmethod
-    def from_contributor(cls, session: Session, db_contributor: Contributor):
+    def from_contributor(
+        cls,
+        session: Session,
+        db_contributor: Contributor,
+        embed: Optional[Iterable[str]] = None,
+    ):
         assert db_contributor.id is not None
-        contributions = [
-            ContributionShort.from_contribution(session, contribution)
-            for contribution in crud.select_contributor_contributions(
-                session=session, contributor_id=db_contributor.id
+        return cls.from_contributors(session, [db_contributor], embed)[0]
+
+    @classmethod
+    def from_contributors(
+        cls,
+        session: Session,
+        db_contributors: Sequence[Contributor],
+        embed: Optional[Iterable[str]] = None,
+    ) -> list["ContributorWithAttributesShortPublic"]:
+        """Contributions of all the contributors, and what is rendered with
+        them, are loaded in a fixed number of queries."""
+        contributions: dict[int | None, list[ContributionShort]] = {}
+        if embed is None or "contributions" in embed:
+            db_contributions = crud.select_contributors_contributions(
+                session, [contributor.id for contributor in db_contributors]
+            )
+            crud.contribution_loader(session).prime(
+                chain.from_iterable(db_contributions.values()),
+                crud.CONTRIBUTION_EMBEDS,
             )
+            contributions = {
+                contributor_id: ContributionShort.from_contributions(session, items)
+                for contributor_id, items in db_contributions.items()
+            }
+        return [
+            cls.model_validate(
+                contributor,
+                update={"contributions": contributions.get(contributor.id, [])},
+            )
+            for contributor in db_contributors
         ]
-        return cls.model_validate(
-            db_contributor, update={"contributions": contributions}
-        )
 
 
 class ContributorViewPublic(ContributorWithAttributesShortPublic):
@@ -153,20 +343,30 @@ class ContributorViewPublic(ContributorWithAttributesShortPublic):
     reviewed_contributions: list["ContributionShort"] = []
 
     @classmethod
-    def from_contributor(cls, session: Session, db_contributor: Contributor):
+    def from_contributor(
+        cls,
+        session: Session,
+        db_contributor: Contributor,
+        embed: Optional[Iterable[str]] = None,
+    ):
         assert db_contributor.id is not None
-        contributions = [
-            ContributionShort.from_contribution(session, contribution)
-            for contribution in crud.select_contributor_contributions(
-                session=session, contributor_id=db_contributor.id
+        embed = crud.CONTRIBUTOR_EMBEDS if embed is None else embed
+        contributions = []
+        if "contributions" in embed:
+            contributions = ContributionShort.from_contributions(
+                session,
+                crud.select_contributor_contributions(
+                    session=session, contributor_id=db_contributor.id
+                ),
             )
-        ]
-        reviewed_contributions = [
-            ContributionShort.from_contribution(session, contribution)
-            for contribution in crud.select_contributor_reviewed_contributions(
-                session=session, contributor_id=db_contributor.id
+        reviewed_contributions = []
+        if "reviewed_contributions" in embed:
+            reviewed_contributions = ContributionShort.from_contributions(
+                session,
+                crud.select_contributor_reviewed_contributions(
+                    session=session, contributor_id=db_contributor.id
+                ),
             )
-        ]
         return cls.model_validate(
             db_contributor,
             update={
@@ -190,6 +390,16 @@ class TagCreate(TagBase):
 
 
 class Tag(TagBase, table=True):
+    __table_args__ = (
+        Index("ix_tag_created_at_id", "created_at", "id"),
+        Index(
+            "ix_tag_display_name_trgm",
+            "display_name",
+            postgresql_using="gin",
+            postgresql_ops={"display_name": "gin_trgm_ops"},
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime | None = Field(
         default=None,
@@ -216,18 +426,56 @@ class TagUpdate(TagBase):
     pass
 
 
-class TagPublic(TagBase):
+class TagShort(TagBase):
+    """A tag as rendered along with contributions."""
+
     id: int
     created_at: datetime
     updated_at: datetime
 
 
-class TagViewPublic(TagBase):
-    id: int
-    created_at: datetime
-    updated_at: datetime
+class TagPublic(TagShort):
+    contribution_count: int = 0
+
+    @classmethod
+    def from_tag(cls, session: Session, db_tag: Tag):
+        return cls.from_tags(session, [db_tag])[0]
+
+    @classmethod
+    def from_tags(cls, session: Session, db_tags: Sequence[Tag]) -> list["TagPublic"]:
+        """Contributions of all the tags are counted in a single query."""
+        counts = crud.select_tags_contribution_counts(
+            session, [tag.id for tag in db_tags]
+        )
+        return [
+            cls.model_validate(tag, update={"contribution_count": counts[tag.id]})
+            for tag in db_tags
+        ]
+
+
+class TagViewPublic(TagPublic):
+    """Public view of a tag, with a page of its contributions."""
+
     contributions: list["ContributionShort"] = []
 
+    @classmethod
+    def from_tag(
+        cls,
+        session: Session,
+        db_tag: Tag,
+        contributions: Sequence["Contribution"] = (),
+    ):
+        counts = crud.select_tags_contribution_counts(session, [db_tag.id])
+        return cls.model_validate(
+            db_tag,
+            update={
+                "contribution_count": counts[db_tag.id],
+                "contributions": ContributionShort.from_contributions(
+                    session, contributions
+                ),
+            },
+        )
+
 
 class ReviewBase(SQLModel):
     notes: str | None = None
@@ -251,6 +499,8 @@ class ReviewCreate(ReviewBase):
 
 
 class Review(ReviewBase, table=True):
+    __table_args__ = (Index("ix_review_created_at_id", "created_at", "id"),)
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime | None = Field(
         default=None,
@@ -349,7 +599,32 @@ class ContributionCreate(ContributionBase):
         return v
 
 
+class ContributionBulkItem(ContributionCreate):
+    # name other items of the same batch can use in their dependencies
+    ref: str | None = None
+
+
+class ContributionBulkResult(SQLModel):
+    index: int
+    ref: str | None = None
+    id: str | None = None
+    error: str | None = None
+
+
 class Contribution(ContributionBase, table=True):
+    __table_args__ = (
+        Index("ix_contribution_date_id", "date", "id"),
+        Index("ix_contribution_created_at_id", "created_at", "id"),
+        Index("ix_contribution_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_contribution_active_date_id",
+            "date",
+            "id",
+            postgresql_where=text("archived_at IS NULL"),
+        ),
+        Index("ix_contribution_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: str = Field(primary_key=True)
     created_at: datetime | None = Field(
         default=None,
@@ -373,19 +648,42 @@ class Contribution(ContributionBase, table=True):
     wiki_link: str | None = None
     highlighted_discord_message: str | None = None
 
+    # maintained by Postgres, used by full-text search
+    search_vector: str | None = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(short_title, '')), 'A') || "
+                "setweight(to_tsvector('english', description), 'B')",
+                persisted=True,
+            ),
+        ),
+    )
+
     contributors: list[ContributionContributorLink] = Relationship(
-        back_populates="contribution"
+        back_populates="contribution",
+        sa_relationship_kwargs=dict(
+            order_by="ContributionContributorLink.contributor_order"
+        ),
     )
+    # ordered as `crud.ContributionLoader` orders them
     tags: list["Tag"] = Relationship(
-        back_populates="contributions", link_model=ContributionTagLink
+        back_populates="contributions",
+        link_model=ContributionTagLink,
+        sa_relationship_kwargs=dict(order_by="Tag.id"),
+    )
+    reviews: list["Review"] = Relationship(
+        back_populates="contribution", sa_relationship_kwargs=dict(order_by="Review.id")
     )
-    reviews: list["Review"] = Relationship(back_populates="contribution")
     dependencies: list["Contribution"] = Relationship(
         back_populates="dependents",
         link_model=ContributionDependencyLink,
         sa_relationship_kwargs=dict(
             primaryjoin="Contribution.id==ContributionDependencyLink.dependent_id",
             secondaryjoin="Contribution.id==ContributionDependencyLink.dependency_id",
+            order_by="Contribution.id",
         ),
     )
     dependents: list["Contribution"] = Relationship(
@@ -398,6 +696,12 @@ class Contribution(ContributionBase, table=True):
     )
 
 
+# only the search query reads it, plain selects of contributions leave it out
+Contribution.__mapper__.add_property(
+    "search_vector", deferred(Contribution.__table__.c.search_vector)
+)
+
+
 class ContributionUpdate(ContributionBase):
     discord_chat_link: HttpUrl | None = Field(default=None)
     github_link: HttpUrl | None = Field(default=None)
@@ -430,6 +734,13 @@ class ContributionDependency(SQLModel):
     short_title: str | None = None
 
 
+class ContributionNode(ContributionDependency):
+    """A contribution reached while walking the dependency graph,
+    `depth` hops away from the starting contribution."""
+
+    depth: int
+
+
 class ContributionShort(SQLModel):
     id: str
     title: str
@@ -446,19 +757,35 @@ class ContributionShort(SQLModel):
     archive_reason: str | None = None
 
     contributors: list[ContributorShort] = []
-    tags: list[TagPublic] = []
+    tags: list[TagShort] = []
     reviews: list[ReviewShort] = []
     dependencies: list[ContributionDependency] = []
 
     @classmethod
     def from_contribution(cls, session: Session, db_contribution: Contribution):
-        contributors = crud.select_contribution_contributors(
-            session=session, contribution_id=db_contribution.id
-        )
+        loader = crud.contribution_loader(session)
         return cls.model_validate(
-            db_contribution, update={"contributors": contributors}
+            db_contribution,
+            update={
+                relationship: loader.load(db_contribution, relationship)
+                for relationship in crud.CONTRIBUTION_EMBEDS
+            },
         )
 
+    @classmethod
+    def from_contributions(
+        cls, session: Session, db_contributions: Iterable[Contribution]
+    ) -> list["ContributionShort"]:
+        """Relationships of all the contributions are loaded in batches."""
+        db_contributions = list(db_contributions)
+        crud.contribution_loader(session).prime(
+            db_contributions, crud.CONTRIBUTION_EMBEDS
+        )
+        return [
+            cls.from_contribution(session, contribution)
+            for contribution in db_contributions
+        ]
+
 
 class ContributionWithAttributesShortPublic(ContributionBase):
     id: str
@@ -472,7 +799,7 @@ class ContributionWithAttributesShortPublic(ContributionBase):
     highlighted_discord_message: str | None = None
 
     contributors: list[ContributorShort] = []
-    tags: list[TagPublic] = []
+    tags: list[TagShort] = []
     reviews: list[ReviewPublic] = []
     dependencies: list[ContributionShort] = []
 
@@ -482,16 +809,67 @@ class ContributionWithAttributesShortPublic(ContributionBase):
         session: Session,
         db_contribution: Contribution,
         contributors: Optional[list[Contributor]] = None,
+        embed: Optional[Iterable[str]] = None,
     ):
-        if contributors is None:
-            contributors = crud.select_contribution_contributors(
-                session=session, contribution_id=db_contribution.id
+        """`embed` restricts the relationships rendered, the others are left
+        empty without being loaded."""
+        embed = crud.CONTRIBUTION_EMBEDS if embed is None else embed
+        loader = crud.contribution_loader(session)
+        update: dict = {}
+        for relationship in crud.CONTRIBUTION_EMBEDS:
+            if relationship not in embed:
+                update[relationship] = []
+            elif relationship == "contributors" and contributors is not None:
+                update[relationship] = contributors
+            else:
+                update[relationship] = loader.load(db_contribution, relationship)
+        if "dependencies" in embed:
+            update["dependencies"] = ContributionShort.from_contributions(
+                session, update["dependencies"]
             )
-        dependencies = [
-            ContributionShort.from_contribution(session, dependency)
-            for dependency in db_contribution.dependencies
-        ]
+        return cls.model_validate(db_contribution, update=update)
+
+
+class ContributionSearchResult(ContributionShort):
+    rank: float
+    title_highlight: str
+    snippet: str
+
+    @classmethod
+    def from_search_result(
+        cls,
+        session: Session,
+        db_contribution: Contribution,
+        rank: float,
+        title_highlight: str,
+        snippet: str,
+    ):
+        contributors = crud.contribution_loader(session).load(
+            db_contribution, "contributors"
+        )
         return cls.model_validate(
             db_contribution,
-            update={"contributors": contributors, "dependencies": dependencies},
+            update={
+                "contributors": contributors,
+                "rank": rank,
+                "title_highlight": title_highlight,
+                "snippet": snippet,
+            },
         )
+
+
+class ContributionGraphNode(SQLModel):
+    id: str
+    short_title: str | None = None
+    date: datetime
+    tag_ids: list[int] = []
+
+
+class ContributionGraphEdge(SQLModel):
+    dependency_id: str
+    dependent_id: str
+
+
+class ContributionGraph(SQLModel):
+    nodes: list[ContributionGraphNode] = []
+    edges: list[ContributionGraphEdge] = []
@@ -1,15 +1,18 @@
 import os
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
 from datetime import datetime
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlmodel import Session, delete
 from structlog import get_logger
 
 os.environ["POSTGRES_DB"] = "cosearch-db-test"
 
-from app.core.db import engine, init_db  # noqa E402
+from app.core.cache import response_cache  # noqa E402
+from app.core.db import async_engine, engine, init_db  # noqa E402
 from app.main import app  # noqa E402
 from app.models import (  # noqa E402
     Contribution,
@@ -51,6 +54,7 @@ def db() -> Generator[Session, None, None]:
         statement = delete(Tag)
         session.execute(statement)
         session.commit()
+        response_cache.clear()
 
 
 @pytest.fixture(scope="module")
@@ -59,6 +63,29 @@ def client() -> Generator[TestClient, None, None]:
         yield c
 
 
+@pytest.fixture(scope="function")
+def count_queries() -> Callable:
+    """Count the SQL statements sent to the database inside a `with` block."""
+
+    @contextmanager
+    def counter() -> Generator[list[str], None, None]:
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engines = [engine, async_engine.sync_engine]
+        for e in engines:
+            event.listen(e, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+
 @pytest.fixture(scope="function")
 def add_contributors(db: Session) -> tuple[Contributor, Contributor]:
     from app import crud
@@ -0,0 +1,65 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import run_in_async_session
+from app.api.routes import contributions, contributors
+from app.core.db import async_engine
+from app.models import ContributorWithAttributesShortPublic
+
+
+@pytest.fixture(scope="function")
+def async_client() -> Generator[TestClient, None, None]:
+    app = FastAPI()
+    app.get("/contributions/{contribution_id}")(
+        run_in_async_session(contributions.read_contribution)
+    )
+    app.put("/contributions/{contribution_id}")(
+        run_in_async_session(contributions.update_contribution)
+    )
+    # returns the ORM row, whose contributions render lazily
+    app.post(
+        "/contributors",
+        response_model=ContributorWithAttributesShortPublic,
+    )(run_in_async_session(contributors.create_contributor))
+    with TestClient(app) as c:
+        yield c
+    # pooled connections belong to the event loop of the test client
+    async_engine.sync_engine.dispose(close=False)
+
+
+def test_async_session_route(client, async_client, add_contribution_with_dependency):
+    contribution_1, contribution_2, contributor_1, _ = add_contribution_with_dependency
+
+    response = async_client.get(f"/contributions/{contribution_2.id}")
+    assert response.status_code == 200
+    assert response.json() == client.get(f"/contributions/{contribution_2.id}").json()
+
+    response = async_client.put(
+        f"/contributions/{contribution_2.id}",
+        json={
+            "title": "Async title",
+            "date": "2021-01-01 00:00:00",
+            "links": [],
+            "description": contribution_2.description,
+            "contributors": [contributor_1.id],
+            "tags": [],
+            "dependencies": [contribution_1.id],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    assert response.json()["title"] == "Async title"
+    assert response.json()["dependencies"][0]["id"] == contribution_1.id
+
+    response = client.get(f"/contributions/{contribution_2.id}")
+    assert response.json()["title"] == "Async title"
+
+    response = async_client.get("/contributions/unknown")
+    assert response.status_code == 400
+
+    response = async_client.post("/contributors", json={"local_handle": "async"})
+    assert response.status_code == 200, response.json()
+    assert response.json()["local_handle"] == "async"
+    assert response.json()["contributions"] == []
@@ -0,0 +1,45 @@
+def test_autocomplete_contributors(client, add_contributors):
+    contributor_1, contributor_2 = add_contributors
+
+    response = client.get("/autocomplete", params={"q": "test_contrib"})
+    assert response.status_code == 200, response.json()
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    # both handles start with the query, the most similar one comes first
+    assert response.json() == [
+        {"id": contributor_1.id, "label": contributor_1.display_name},
+        {"id": contributor_2.id, "label": contributor_2.display_name},
+    ]
+
+    # only the second handle starts with the query, the first one resembles it
+    response = client.get("/autocomplete", params={"q": "test_contributor2"})
+    assert response.json() == [
+        {"id": contributor_2.id, "label": contributor_2.display_name},
+        {"id": contributor_1.id, "label": contributor_1.display_name},
+    ]
+
+    # matched on display name, case insensitive
+    response = client.get("/autocomplete", params={"q": "test contributor 2"})
+    assert response.json()[0] == {
+        "id": contributor_2.id,
+        "label": contributor_2.display_name,
+    }
+
+    # fuzzy match
+    response = client.get("/autocomplete", params={"q": "contribtor"})
+    assert {item["id"] for item in response.json()} == {
+        contributor_1.id,
+        contributor_2.id,
+    }
+
+    # wildcards are matched literally
+    response = client.get("/autocomplete", params={"q": "%"})
+    assert response.json() == []
+
+
+def test_autocomplete_tags(client, add_tag):
+    response = client.get("/autocomplete", params={"q": "tes", "kind": "tag"})
+    assert response.status_code == 200, response.json()
+    assert response.json() == [{"id": add_tag.id, "label": add_tag.display_name}]
+
+    response = client.get("/autocomplete", params={"q": "unknown", "kind": "tag"})
+    assert response.json() == []
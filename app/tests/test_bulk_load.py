@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+
+
+def test_load_files(client, tmp_path):
+    from app.bulk_load import load_files
+
+    (tmp_path / "contributor.csv").write_text(
+        "id,local_handle,display_name\n" "1001,loaded_1,Loaded One\n" "1002,loaded_2,\n"
+    )
+    (tmp_path / "tag.ndjson").write_text(
+        json.dumps({"id": 2001, "display_name": "Loaded", "color": "#ffffff"}) + "\n"
+    )
+    (tmp_path / "contribution.ndjson").write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "id": contribution_id,
+                    "title": f"Loaded {contribution_id}",
+                    "date": "2021-01-01T00:00:00",
+                    "description": "Loaded with COPY",
+                    "links": [{"url": "https://example.com", "description": "Ex"}],
+                }
+            )
+            for contribution_id in ("loaded01", "loaded02")
+        )
+    )
+    (tmp_path / "contributioncontributorlink.csv").write_text(
+        "contribution_id,contributor_id,contributor_order\n"
+        "loaded01,1002,0\n"
+        "loaded01,1001,1\n"
+        "loaded02,1001,0\n"
+    )
+    (tmp_path / "contributiontaglink.csv").write_text(
+        "contribution_id,tag_id\nloaded02,2001\n"
+    )
+    (tmp_path / "contributiondependencylink.csv").write_text(
+        "dependent_id,dependency_id\nloaded02,loaded01\n"
+    )
+    # not a table file
+    (tmp_path / "README.md").write_text("snapshot")
+
+    counts = load_files([tmp_path])
+    assert counts == {
+        "contributor": 2,
+        "tag": 1,
+        "contribution": 2,
+        "contributioncontributorlink": 3,
+        "contributiontaglink": 1,
+        "contributiondependencylink": 1,
+    }
+
+    content = client.get("/contributions/loaded02").json()
+    assert [c["local_handle"] for c in content["contributors"]] == ["loaded_1"]
+    assert [t["display_name"] for t in content["tags"]] == ["Loaded"]
+    assert [d["id"] for d in content["dependencies"]] == ["loaded01"]
+    content = client.get("/contributions/loaded01").json()
+    assert [c["id"] for c in content["contributors"]] == [1002, 1001]
+    assert content["links"] == [{"url": "https://example.com/", "description": "Ex"}]
+
+    # sequences continue after the loaded IDs
+    response = client.post("/contributors/", json={"local_handle": "created"})
+    assert response.json()["id"] > 1002
+
+    # existing rows are skipped, or updated on request, along with their
+    # update time, and the cached responses are dropped
+    before = client.get("/contributors/1002")
+    path = tmp_path / "contributor.csv"
+    path.write_text("id,local_handle,display_name\n1002,loaded_2,Loaded Two\n")
+    assert load_files([path]) == {"contributor": 0}
+    assert load_files([path], on_conflict="update") == {"contributor": 1}
+    response = client.get(
+        "/contributors/1002", headers={"If-None-Match": before.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["display_name"] == "Loaded Two"
+    assert datetime.fromisoformat(
+        response.json()["updated_at"]
+    ) > datetime.fromisoformat(before.json()["updated_at"])
+
+    # of rows repeating a primary key, the last one is loaded
+    path.write_text(
+        "id,local_handle,display_name\n"
+        "1002,loaded_2,Loaded Twice\n"
+        "1002,loaded_2,Loaded Last\n"
+    )
+    assert load_files([path], on_conflict="update") == {"contributor": 1}
+    response = client.get("/contributors/1002")
+    assert response.json()["display_name"] == "Loaded Last"
+
+
+def test_load_files_rejects_bad_columns(client, tmp_path):
+    import pytest
+
+    from app.bulk_load import load_files
+
+    path = tmp_path / "tag.csv"
+    path.write_text("id,display_name,colour\n3001,Bad,#ffffff\n")
+    with pytest.raises(ValueError, match="unknown columns colour"):
+        load_files([path])
+
+    path = tmp_path / "tag.ndjson"
+    path.write_text(
+        json.dumps({"id": 3001, "display_name": "First"})
+        + "\n"
+        + json.dumps({"id": 3002, "display_name": "Second", "color": "#ffffff"})
+        + "\n"
+    )
+    with pytest.raises(ValueError, match="differ from the first line"):
+        load_files([path])
+    assert client.get("/tags/3001").status_code != 200
@@ -541,3 +541,694 @@ def test_contribution_dependents(client, add_contribution_with_dependency):
             }
         ],
     }
+
+
+def _add_contributions(db, count, contributors, tag, dependency):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks, ReviewCreate
+
+    for i in range(count):
+        contribution, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=f"Bulk Contribution {i}",
+                date=datetime(2021, 1, 1, 0, 0, 0),
+                links=[
+                    ContributionLinks(description="Link", url="https://example.com")
+                ],
+                description="Bulk description",
+                contributors=[contributor.id for contributor in contributors],
+                tags=[tag.id],
+                dependencies=[dependency.id],
+            ),
+        )
+        crud.create_review(
+            session=db,
+            review_in=ReviewCreate(
+                contribution_id=contribution.id, reviewers=[contributors[0].id]
+            ),
+        )
+
+
+def test_read_contribution_tags_ordered(client, db, add_contributors):
+    from app import crud
+    from app.models import ContributionCreate, TagCreate
+
+    contributor_1, _ = add_contributors
+    tag_ids = [
+        crud.create_tag(
+            session=db, tag=TagCreate(display_name=f"Ordered {i}", color="#000000")
+        ).id
+        for i in range(3)
+    ]
+    contribution, _ = crud.create_contribution(
+        session=db,
+        contribution=ContributionCreate(
+            title="Ordered tags",
+            date=datetime(2021, 1, 1, 0, 0, 0),
+            links=[],
+            description="Tags linked in reverse order",
+            contributors=[contributor_1.id],
+            tags=tag_ids[::-1],
+        ),
+    )
+
+    # the eager loader options and the contribution loader agree on the order
+    response = client.get(f"/contributions/{contribution.id}")
+    assert [t["id"] for t in response.json()["tags"]] == tag_ids
+    response = client.get("/contributions/")
+    assert [t["id"] for t in response.json()[0]["tags"]] == tag_ids
+    response = client.get(f"/tags/{tag_ids[0]}")
+    content = response.json()["contributions"]
+    assert [t["id"] for t in content[0]["tags"]] == tag_ids
+    response = client.get(f"/contributors/{contributor_1.id}")
+    content = response.json()["contributions"]
+    assert [t["id"] for t in content[0]["tags"]] == tag_ids
+
+
+def test_read_contributions_query_count(
+    client, db, count_queries, add_contribution_with_dependency, add_tag
+):
+    (
+        contribution_1,
+        contribution_2,
+        contributor_1,
+        contributor_2,
+    ) = add_contribution_with_dependency
+    contributors = [contributor_1, contributor_2]
+
+    _add_contributions(db, 2, contributors, add_tag, contribution_2)
+    with count_queries() as queries:
+        response = client.get("/contributions/")
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+    small_page_queries = len(queries)
+    # the full-text search vector is only fetched by searches
+    assert not any("search_vector" in query for query in queries)
+
+    _add_contributions(db, 10, contributors, add_tag, contribution_2)
+    with count_queries() as queries:
+        response = client.get("/contributions/")
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 14
+    assert len(queries) == small_page_queries
+
+    bulk = [c for c in content if c["title"].startswith("Bulk")]
+    for item in bulk:
+        assert [c["id"] for c in item["contributors"]] == [
+            contributor_1.id,
+            contributor_2.id,
+        ]
+        assert [t["id"] for t in item["tags"]] == [add_tag.id]
+        assert item["reviews"][0]["reviewers"][0]["id"] == contributor_1.id
+        assert item["dependencies"][0]["id"] == contribution_2.id
+        assert item["dependencies"][0]["dependencies"] == [
+            {
+                "id": contribution_1.id,
+                "title": contribution_1.title,
+                "short_title": contribution_1.short_title,
+            }
+        ]
+
+
+def test_read_contributions_with_cursor(client, db, add_contributors, add_tag):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks
+
+    contributor_1, _ = add_contributors
+    created_ids = []
+    for day in [3, 1, 2, 1, 5]:
+        contribution, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=f"Contribution of day {day}",
+                date=datetime(2021, 1, day, 0, 0, 0),
+                links=[
+                    ContributionLinks(description="Link", url="https://example.com")
+                ],
+                description="Description",
+                contributors=[contributor_1.id],
+                tags=[],
+            ),
+        )
+        created_ids.append((contribution.date, contribution.id))
+    expected_ids = [id for _, id in sorted(created_ids)]
+
+    ids = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get("/contributions/", params={"limit": 2, "cursor": cursor})
+        assert response.status_code == 200, response.json()
+        page = response.json()
+        assert len(page) <= 2
+        ids.extend(contribution["id"] for contribution in page)
+        cursor = response.headers.get("X-Next-Cursor")
+    assert ids == expected_ids
+
+    # offset pagination keeps working, in the same order
+    response = client.get("/contributions/", params={"skip": 2, "limit": 2})
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    assert [c["id"] for c in response.json()] == expected_ids[2:4]
+
+    response = client.get("/contributions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_read_contributions_with_filters(client, db, add_contributors, add_tag):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks
+
+    contributor_1, contributor_2 = add_contributors
+
+    def create(day, contributors, tags):
+        contribution, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=f"Contribution of day {day}",
+                date=datetime(2021, 1, day, 0, 0, 0),
+                links=[
+                    ContributionLinks(description="Link", url="https://example.com")
+                ],
+                description="Description",
+                contributors=contributors,
+                tags=tags,
+            ),
+        )
+        return contribution.id
+
+    both_tagged = create(1, [contributor_1.id, contributor_2.id], [add_tag.id])
+    first_tagged = create(2, [contributor_1.id], [add_tag.id])
+    second = create(3, [contributor_2.id], [])
+    archived = create(4, [contributor_1.id], [])
+    db_archived = crud.select_contribution_by_id(db, archived)
+    db_archived.archived_at = datetime(2021, 2, 1, 0, 0, 0)
+    db.add(db_archived)
+    db.commit()
+
+    def ids(**params):
+        response = client.get("/contributions/", params=params)
+        assert response.status_code == 200, response.json()
+        return [contribution["id"] for contribution in response.json()]
+
+    assert ids() == [both_tagged, first_tagged, second, archived]
+    assert ids(tag=add_tag.id) == [both_tagged, first_tagged]
+    assert ids(contributor=contributor_2.id) == [both_tagged, second]
+    assert ids(contributor=[contributor_1.id, contributor_2.id]) == [both_tagged]
+    assert ids(tag=add_tag.id, contributor=contributor_2.id) == [both_tagged]
+    assert ids(date_from="2021-01-02T00:00:00", date_to="2021-01-03T00:00:00") == [
+        first_tagged,
+        second,
+    ]
+    assert ids(archived=True) == [archived]
+    assert ids(archived=False, sort="-date") == [second, first_tagged, both_tagged]
+
+    response = client.get("/contributions/", params={"sort": "-date", "limit": 3})
+    assert [c["id"] for c in response.json()] == [archived, second, first_tagged]
+    response = client.get(
+        "/contributions/", params={"sort": "-date", "limit": 3, "cursor": ""}
+    )
+    response = client.get(
+        "/contributions/",
+        params={"sort": "-date", "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert [c["id"] for c in response.json()] == [both_tagged]
+
+    response = client.get("/contributions/", params={"sort": "title"})
+    assert response.status_code == 422
+
+
+def test_search_contributions(client, db, add_contributors):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks
+
+    contributor_1, _ = add_contributors
+
+    def create(title, description):
+        contribution, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=title,
+                date=datetime(2021, 1, 1, 0, 0, 0),
+                links=[
+                    ContributionLinks(description="Link", url="https://example.com")
+                ],
+                description=description,
+                contributors=[contributor_1.id],
+                tags=[],
+            ),
+        )
+        return contribution.id
+
+    in_title = create("Cyclers decider", "Decides machines that loop.")
+    in_description = create("Translated cyclers", "A decider for translated cyclers.")
+    create("Bouncers", "Machines that bounce between walls.")
+
+    response = client.get("/contributions/search", params={"q": "decider"})
+    assert response.status_code == 200, response.json()
+    content = response.json()
+    assert [result["id"] for result in content] == [in_title, in_description]
+    assert content[0]["title_highlight"] == "Cyclers <b>decider</b>"
+    assert "<b>decider</b>" in content[1]["snippet"]
+    assert content[0]["rank"] > content[1]["rank"]
+    assert content[0]["contributors"][0]["id"] == contributor_1.id
+
+    # the search vector follows updates
+    response = client.put(
+        f"/contributions/{in_description}",
+        json={
+            "title": "Translated cyclers",
+            "date": "2021-01-01 00:00:00",
+            "links": [],
+            "description": "Loops forever.",
+            "contributors": [contributor_1.id],
+            "tags": [],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    response = client.get("/contributions/search", params={"q": "decider"})
+    assert [result["id"] for result in response.json()] == [in_title]
+
+    response = client.get("/contributions/search", params={"q": ""})
+    assert response.status_code == 422
+
+
+def test_contribution_ancestors_and_descendants(
+    client, db, add_contribution_with_dependency
+):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks
+
+    contribution_1, contribution_2, contributor_1, _ = add_contribution_with_dependency
+
+    def create(title, dependencies):
+        contribution, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=title,
+                date=datetime(2021, 1, 1, 0, 0, 0),
+                links=[
+                    ContributionLinks(description="Link", url="https://example.com")
+                ],
+                description="Description",
+                contributors=[contributor_1.id],
+                tags=[],
+                dependencies=dependencies,
+            ),
+        )
+        return contribution.id
+
+    # 1 <- 2 <- 3 <- 4, and 1 <- 4 directly
+    contribution_3 = create("Third", [contribution_2.id])
+    contribution_4 = create("Fourth", [contribution_3, contribution_1.id])
+
+    response = client.get(f"/contributions/{contribution_4}/ancestors")
+    assert response.status_code == 200, response.json()
+    assert [(node["id"], node["depth"]) for node in response.json()] == sorted(
+        [(contribution_1.id, 1), (contribution_3, 1), (contribution_2.id, 2)],
+        key=lambda node: (node[1], node[0]),
+    )
+    assert response.json()[-1] == {
+        "id": contribution_2.id,
+        "title": contribution_2.title,
+        "short_title": contribution_2.short_title,
+        "depth": 2,
+    }
+
+    response = client.get(
+        f"/contributions/{contribution_1.id}/descendants", params={"max_depth": 2}
+    )
+    assert response.status_code == 200, response.json()
+    assert [(node["id"], node["depth"]) for node in response.json()] == sorted(
+        [(contribution_2.id, 1), (contribution_4, 1), (contribution_3, 2)],
+        key=lambda node: (node[1], node[0]),
+    )
+
+    response = client.get(f"/contributions/{contribution_1.id}/ancestors")
+    assert response.json() == []
+
+    response = client.get("/contributions/unknown/descendants")
+    assert response.status_code == 400
+
+
+def test_update_contribution_rejects_dependency_cycle(
+    client, add_contribution_with_dependency
+):
+    contribution_1, contribution_2, contributor_1, _ = add_contribution_with_dependency
+
+    def update_dependencies(contribution, dependencies):
+        return client.put(
+            f"/contributions/{contribution.id}",
+            json={
+                "title": contribution.title,
+                "date": "2021-01-01 00:00:00",
+                "links": [],
+                "description": contribution.description,
+                "contributors": [contributor_1.id],
+                "tags": [],
+                "dependencies": dependencies,
+            },
+        )
+
+    # contribution 2 already depends on contribution 1
+    response = update_dependencies(contribution_1, [contribution_2.id])
+    assert response.status_code == 417
+    assert response.json() == {
+        "detail": f"Contributions {contribution_2.id} "
+        "already depend on this contribution"
+    }
+
+    response = update_dependencies(contribution_1, [contribution_1.id])
+    assert response.status_code == 417
+
+    # keeping an existing dependency is fine
+    response = update_dependencies(contribution_2, [contribution_1.id])
+    assert response.status_code == 200, response.json()
+    response = client.get(f"/contributions/{contribution_1.id}/ancestors")
+    assert response.json() == []
+
+
+def test_read_contribution_etag(client, add_review):
+    review, contribution_1, contribution_2, contributor_1, _ = add_review
+
+    response = client.get(f"/contributions/{contribution_2.id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        f"/contributions/{contribution_2.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    # an embedded contributor changes, so does the representation
+    response = client.put(
+        f"/contributors/{contributor_1.id}",
+        json={"local_handle": contributor_1.local_handle, "display_name": "Renamed"},
+    )
+    assert response.status_code == 200
+    response = client.get(
+        f"/contributions/{contribution_2.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["contributors"][0]["display_name"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+    # lists are tagged per page
+    response = client.get("/contributions/")
+    list_etag = response.headers["ETag"]
+    response = client.get("/contributions/", headers={"If-None-Match": list_etag})
+    assert response.status_code == 304
+    response = client.get(
+        "/contributions/", params={"limit": 1}, headers={"If-None-Match": list_etag}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/contributions/unknown")
+    assert response.status_code == 400
+
+
+def test_create_contributions_bulk(client, count_queries, add_contribution, add_tag):
+    contribution_1, contributor_1, contributor_2 = add_contribution
+
+    def item(title, ref=None, dependencies=[], contributors=None, tags=[]):
+        return {
+            "ref": ref,
+            "title": title,
+            "date": "2021-01-01 00:00:00",
+            "links": [],
+            "description": f"{title} description",
+            "contributors": contributors or [contributor_2.id, contributor_1.id],
+            "tags": tags,
+            "dependencies": dependencies,
+        }
+
+    items = [
+        # depends on an item defined later in the batch
+        item("Second", ref="b", dependencies=["a", contribution_1.id]),
+        item("First", ref="a", tags=[add_tag.id]),
+        item("Missing tag", ref="c", tags=[-1]),
+        item("Depends on failed", dependencies=["c"]),
+        item("Cycle 1", ref="x", dependencies=["y"]),
+        item("Cycle 2", ref="y", dependencies=["x"]),
+        item("Missing dependency", dependencies=["unknown"], contributors=[-1]),
+        item("Behind cycle", ref="z", dependencies=["y"]),
+        item("Existing ref", ref=contribution_1.id),
+        item("Depends on existing ref", dependencies=[contribution_1.id]),
+    ]
+    with count_queries() as queries:
+        response = client.post("/contributions/bulk", json=items)
+    assert response.status_code == 200, response.json()
+    results = response.json()
+    # 3 lookups, 4 inserts
+    assert len([q for q in queries if q.startswith(("SELECT", "INSERT"))]) == 7
+
+    assert [result["index"] for result in results] == list(range(len(items)))
+    second, first = results[0]["id"], results[1]["id"]
+    assert second and first and results[0]["error"] is None
+    assert results[2]["id"] is None
+    assert results[2]["error"] == "Tag ID -1 cannot be found."
+    assert results[3]["error"] == "Dependencies c failed"
+    assert results[4]["error"] == results[5]["error"] == "Dependency cycle"
+    assert results[6]["error"] == (
+        "Contributor ID -1, Dependency ID unknown cannot be found."
+    )
+    assert results[7]["error"] == "Dependencies y failed"
+    assert results[8]["error"] == (
+        f"Ref {contribution_1.id} is an existing contribution ID"
+    )
+    assert results[9]["error"] == f"Dependencies {contribution_1.id} failed"
+
+    response = client.get(f"/contributions/{second}")
+    assert response.status_code == 200
+    content = response.json()
+    assert [c["id"] for c in content["contributors"]] == [
+        contributor_2.id,
+        contributor_1.id,
+    ]
+    assert sorted(d["id"] for d in content["dependencies"]) == sorted(
+        [first, contribution_1.id]
+    )
+    response = client.get(f"/contributions/{first}")
+    assert [t["id"] for t in response.json()["tags"]] == [add_tag.id]
+
+
+def test_update_contribution_query_count(client, db, count_queries, add_contribution):
+    from app import crud
+    from app.models import ContributorUpsert, TagCreate
+
+    contribution_1, contributor_1, contributor_2 = add_contribution
+    contributors = [contributor_1.id, contributor_2.id] + [
+        crud.create_contributor(
+            session=db,
+            contributor_in=ContributorUpsert(
+                local_handle=f"bulk_contributor_{i}",
+                display_name=f"Bulk Contributor {i}",
+                discord_handle=f"bulk_contributor_{i}#1234",
+            ),
+        ).id
+        for i in range(18)
+    ]
+    tags = [
+        crud.create_tag(
+            session=db, tag=TagCreate(display_name=f"Tag {i}", color="#ffffff")
+        ).id
+        for i in range(10)
+    ]
+
+    def update(contributors, tags):
+        return client.put(
+            f"/contributions/{contribution_1.id}",
+            json={
+                "title": contribution_1.title,
+                "date": "2021-01-01 00:00:00",
+                "links": [],
+                "description": contribution_1.description,
+                "contributors": contributors,
+                "tags": tags,
+                "dependencies": [],
+            },
+        )
+
+    response = update(contributors[:1], tags[:1])
+    assert response.status_code == 200, response.json()
+
+    with count_queries() as queries:
+        response = update(contributors[1:2], tags[1:2])
+    assert response.status_code == 200, response.json()
+    small_update_queries = len(queries)
+
+    with count_queries() as queries:
+        response = update(contributors[:1:-1], tags[2:])
+    assert response.status_code == 200, response.json()
+    assert len(queries) == small_update_queries
+    content = response.json()
+    assert [c["id"] for c in content["contributors"]] == contributors[:1:-1]
+    assert sorted(t["id"] for t in content["tags"]) == sorted(tags[2:])
+
+    # every missing ID is reported at once
+    response = update([contributor_1.id, -1, -2], [-3])
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": (
+            "Tags with ID -3, Contributor ID -1, Contributor ID -2 cannot be found."
+        )
+    }
+
+
+def test_update_contribution_contributor_link_writes(
+    client, count_queries, add_contribution
+):
+    contribution_1, contributor_1, contributor_2 = add_contribution
+
+    def update(contributors):
+        return client.put(
+            f"/contributions/{contribution_1.id}",
+            json={
+                "title": contribution_1.title,
+                "date": "2021-01-01 00:00:00",
+                "links": [],
+                "description": contribution_1.description,
+                "contributors": contributors,
+                "tags": [],
+                "dependencies": [],
+            },
+        )
+
+    def link_writes(queries):
+        return [
+            query.split()[0]
+            for query in queries
+            if "contributioncontributorlink" in query.split("WHERE")[0]
+            and not query.startswith("SELECT")
+        ]
+
+    contributors = [contributor_1.id, contributor_2.id]
+    response = update(contributors)
+    assert response.status_code == 200, response.json()
+
+    with count_queries() as queries:
+        response = update(contributors)
+    assert response.status_code == 200, response.json()
+    assert link_writes(queries) == []
+
+    with count_queries() as queries:
+        response = update(contributors[::-1])
+    assert response.status_code == 200, response.json()
+    assert link_writes(queries) == ["UPDATE"]
+    assert [c["id"] for c in response.json()["contributors"]] == contributors[::-1]
+
+    with count_queries() as queries:
+        response = update(contributors[1:])
+    assert response.status_code == 200, response.json()
+    assert link_writes(queries) == ["DELETE"]
+    assert [c["id"] for c in response.json()["contributors"]] == contributors[1:]
+
+
+def test_read_contributions_sparse_fieldsets(client, count_queries, add_review):
+    review, contribution_1, contribution_2, contributor_1, _ = add_review
+
+    with count_queries() as queries:
+        response = client.get("/contributions?fields=title,date,tags")
+    assert response.status_code == 200
+    # version, page and tags
+    assert len(queries) == 3
+    content = response.json()
+    assert [set(item) for item in content] == [{"id", "title", "date", "tags"}] * 2
+
+    with count_queries() as queries:
+        response = client.get("/contributions?embed=")
+    assert response.status_code == 200
+    assert len(queries) == 2
+    content = response.json()
+    assert "title" in content[0] and "description" in content[0]
+    assert not {"contributors", "tags", "reviews", "dependencies"} & set(content[0])
+
+    response = client.get(
+        f"/contributions/{contribution_2.id}?fields=title,reviews,dependencies"
+        "&embed=reviews,contributors"
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert set(content) == {"id", "title", "reviews"}
+    assert content["reviews"][0]["id"] == review.id
+
+    response = client.get("/contributions?fields=title,unknown")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown fields: unknown"}
+    response = client.get("/contributions?embed=title")
+    assert response.status_code == 400
+
+
+def test_read_contributions_by_ids(client, count_queries, add_review):
+    review, contribution_1, contribution_2, _, _ = add_review
+
+    ids = f"{contribution_2.id},missing,{contribution_1.id},{contribution_2.id}"
+    with count_queries() as queries:
+        response = client.get(f"/contributions?ids={ids}")
+    assert response.status_code == 200
+    with count_queries() as page_queries:
+        client.get("/contributions")
+    # the same batched loads as a page of contributions
+    assert len(queries) == len(page_queries)
+    assert response.headers["X-Missing-IDs"] == "missing"
+    content = response.json()
+    assert [item["id"] for item in content] == [contribution_2.id, contribution_1.id]
+    assert [r["id"] for r in content[0]["reviews"]] == [review.id]
+
+    etag = client.get(f"/contributions?ids={contribution_1.id}").headers["ETag"]
+    response = client.get(
+        f"/contributions?ids={contribution_1.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(f"/contributions?ids={contribution_1.id}&fields=title")
+    assert response.json() == [{"id": contribution_1.id, "title": "Test Contribution"}]
+    assert "X-Missing-IDs" not in response.headers
+
+    response = client.get("/contributions?ids=" + ",".join(["a"] * 101))
+    assert response.status_code == 400
+
+    response = client.get(f"/contributions?ids={contribution_1.id}&archived=false")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "ids cannot be combined with archived"}
+    response = client.get(f"/contributions?ids={contribution_1.id}&limit=1&sort=date")
+    assert response.json() == {"detail": "ids cannot be combined with limit, sort"}
+
+
+def test_read_contribution_children_query_count(
+    client, db, count_queries, add_contribution_with_dependency, add_tag
+):
+    _, contribution_2, contributor_1, contributor_2 = add_contribution_with_dependency
+    contributors = [contributor_1, contributor_2]
+
+    # read before the counting, the fixtures' objects are expired by later commits
+    contribution_2_id = contribution_2.id
+    url = f"/contributions/{contribution_2_id}/children"
+
+    _add_contributions(db, 2, contributors, add_tag, contribution_2)
+    with count_queries() as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    # contribution, children, then contributors, tags, reviews and dependencies
+    assert len(queries) == 6
+
+    _add_contributions(db, 10, contributors, add_tag, contribution_2)
+    with count_queries() as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 12
+    assert len(queries) == 6
+    for item in content:
+        assert [c["id"] for c in item["contributors"]] == [
+            contributor_1.id,
+            contributor_2.id,
+        ]
+        assert [t["id"] for t in item["tags"]] == [add_tag.id]
+        assert len(item["reviews"]) == 1
+        assert [d["id"] for d in item["dependencies"]] == [contribution_2_id]
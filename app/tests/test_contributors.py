@@ -1,3 +1,4 @@
+import base64
 from datetime import datetime
 
 
@@ -92,6 +93,31 @@ def test_create_contributor(client):
     }
 
 
+def test_read_contributor_by_local_handle_etag(client, add_review):
+    _, _, _, contributor_1, _ = add_review
+    url = f"/contributors/local_handle/{contributor_1.local_handle}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.json()["id"] == contributor_1.id
+    etag = response.headers["ETag"]
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.put(
+        f"/contributors/{contributor_1.id}",
+        json={"local_handle": contributor_1.local_handle, "display_name": "Renamed"},
+    )
+    assert response.status_code == 200, response.json()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["display_name"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+    response = client.get("/contributors/local_handle/unknown")
+    assert response.status_code == 400
+
+
 def test_contributor_already_exists(client):
     # create a new contributor
     response = client.post(
@@ -142,6 +168,93 @@ def test_contributor_already_exists(client):
     assert response.json() == {"detail": "Display name already used as local handle"}
 
 
+def test_contributor_names_enforced_by_database(db, add_contributors):
+    import pytest
+
+    from app import crud
+    from app.core.exceptions import ConditionError
+    from app.models import ContributorUpsert
+
+    contributor_1, contributor_2 = add_contributors
+
+    # writes skipping integrity_check_contributor, as a concurrent request would
+    with pytest.raises(ConditionError) as error:
+        crud.create_contributor(
+            session=db,
+            contributor_in=ContributorUpsert(
+                local_handle="another_handle",
+                display_name=contributor_1.local_handle,
+            ),
+        )
+    assert error.value.detail == "Display name already used as local handle"
+
+    with pytest.raises(ConditionError) as error:
+        crud.update_contributor(
+            session=db,
+            contributor=contributor_2,
+            contributor_in=ContributorUpsert(
+                local_handle=contributor_1.display_name,
+            ),
+        )
+    assert error.value.detail == "Local handle already used as display name"
+
+    # names clashing in the same field
+    with pytest.raises(ConditionError) as error:
+        crud.create_contributor(
+            session=db,
+            contributor_in=ContributorUpsert(local_handle=contributor_1.local_handle),
+        )
+    assert error.value.detail == "Local handle already exists"
+
+    with pytest.raises(ConditionError) as error:
+        crud.create_contributor(
+            session=db,
+            contributor_in=ContributorUpsert(
+                local_handle="yet_another_handle",
+                display_name=contributor_1.display_name,
+            ),
+        )
+    assert error.value.detail == "Display name already exists"
+
+    # a contributor can reuse its own names
+    db.refresh(contributor_2)
+    contributor = crud.update_contributor(
+        session=db,
+        contributor=contributor_2,
+        contributor_in=ContributorUpsert(
+            local_handle=contributor_2.local_handle,
+            display_name=contributor_2.local_handle,
+        ),
+    )
+    assert contributor.display_name == contributor_2.local_handle
+
+
+def test_contributor_names_registered_for_existing_contributors(
+    db, add_contributors
+):
+    from sqlmodel import select
+
+    from app.core.db import engine
+    from app.models import ContributorName
+
+    contributor_1, contributor_2 = add_contributors
+    db.commit()
+
+    # as on a database created before the names table
+    ContributorName.__table__.drop(engine)
+    ContributorName.__table__.create(engine)
+
+    names = db.exec(select(ContributorName.name, ContributorName.contributor_id))
+    assert sorted(names.all()) == sorted(
+        [
+            (contributor_1.local_handle, contributor_1.id),
+            (contributor_1.display_name, contributor_1.id),
+            (contributor_2.local_handle, contributor_2.id),
+            (contributor_2.display_name, contributor_2.id),
+        ]
+    )
+
+
 def test_read_contributors(client):
     # create a two contributors
     response_1 = client.post(
@@ -169,6 +282,12 @@ def test_read_contributors(client):
     for item in all_users:
         assert "local_handle" in item
 
+    # a well-formed cursor whose id is not an integer is rejected
+    cursor = base64.urlsafe_b64encode(b'["2020-01-01T00:00:00", "x"]').decode()
+    response = client.get("/contributors/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
 
 def test_read_contributor_reviewed_contributions(client, add_review):
     review, contribution_1, contribution_2, contributor, _ = add_review
@@ -209,3 +328,188 @@ def test_read_contributor_reviewed_contributions(client, add_review):
             }
         ],
     }
+
+
+def test_read_contributor_sparse_fieldsets(client, add_review):
+    review, _, contribution_2, contributor_1, _ = add_review
+
+    response = client.get(
+        f"/contributors/{contributor_1.id}?embed=reviewed_contributions"
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert "contributions" not in content
+    assert [c["id"] for c in content["reviewed_contributions"]] == [contribution_2.id]
+
+    response = client.get(f"/contributors/{contributor_1.id}?fields=local_handle")
+    assert response.json() == {
+        "id": contributor_1.id,
+        "local_handle": contributor_1.local_handle,
+    }
+
+    response = client.get(
+        f"/contributors/local_handle/{contributor_1.local_handle}"
+        "?fields=local_handle,contributions&embed="
+    )
+    assert response.json() == {
+        "id": contributor_1.id,
+        "local_handle": contributor_1.local_handle,
+    }
+
+    response = client.get("/contributors?fields=display_name&embed=")
+    assert [set(item) for item in response.json()] == [{"id", "display_name"}] * 2
+
+
+def test_read_contributors_by_ids(client, count_queries, add_contribution):
+    _, contributor_1, contributor_2 = add_contribution
+
+    ids = f"{contributor_2.id},-1,{contributor_1.id}"
+    with count_queries() as queries:
+        response = client.get(f"/contributors?ids={ids}")
+    assert response.status_code == 200
+    with count_queries() as page_queries:
+        client.get("/contributors")
+    assert len(queries) == len(page_queries)
+    assert response.headers["X-Missing-IDs"] == "-1"
+    content = response.json()
+    assert [item["id"] for item in content] == [contributor_2.id, contributor_1.id]
+    assert [c["title"] for c in content[1]["contributions"]] == ["Test Contribution"]
+
+    response = client.get(
+        "/contributors?local_handles=test_contributor,unknown,test_contributor2"
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Missing-IDs"] == "unknown"
+    assert [item["id"] for item in response.json()] == [
+        contributor_1.id,
+        contributor_2.id,
+    ]
+
+    response = client.get("/contributors?ids=1,a")
+    assert response.status_code == 400
+    response = client.get("/contributors?ids=1&local_handles=test_contributor")
+    assert response.status_code == 400
+    response = client.get("/contributors?ids=1&limit=1")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "ids cannot be combined with limit"}
+    response = client.get("/contributors?local_handles=test_contributor&cursor=")
+    assert response.json() == {
+        "detail": "local_handles cannot be combined with cursor"
+    }
+
+    # missing handles are percent-encoded, whatever characters they hold
+    response = client.get(
+        "/contributors", params={"local_handles": "h\u00e9llo,a\r\nb,\u2603"}
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Missing-IDs"] == "h%C3%A9llo,a%0D%0Ab,%E2%98%83"
+
+
+def test_read_contributors_query_count(client, db, count_queries, add_contribution):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks, ContributorUpsert
+
+    contribution, contributor_1, contributor_2 = add_contribution
+
+    def add_contributors_with_contribution(count: int, start: int) -> None:
+        for i in range(start, start + count):
+            contributor = crud.create_contributor(
+                session=db,
+                contributor_in=ContributorUpsert(local_handle=f"query_count_{i}"),
+            )
+            crud.create_contribution(
+                session=db,
+                contribution=ContributionCreate(
+                    title=f"Query Count {i}",
+                    date=datetime(2021, 1, 1, 0, 0, 0),
+                    links=[ContributionLinks(description="Link", url="https://a.b")],
+                    description="Query count",
+                    contributors=[contributor.id, contributor_1.id],
+                    tags=[],
+                    dependencies=[contribution.id],
+                ),
+            )
+
+    add_contributors_with_contribution(2, 0)
+    with count_queries() as queries:
+        response = client.get("/contributors")
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+    # version, page, contributions, then their contributors, tags, reviews
+    # and dependencies
+    assert len(queries) == 7
+
+    add_contributors_with_contribution(20, 2)
+    with count_queries() as queries:
+        response = client.get("/contributors")
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 24
+    assert len(queries) == 7
+    by_handle = {item["local_handle"]: item for item in content}
+    assert len(by_handle["test_contributor"]["contributions"]) == 23
+    assert by_handle["test_contributor2"]["contributions"] == []
+    contributions = by_handle["query_count_5"]["contributions"]
+    assert [c["title"] for c in contributions] == ["Query Count 5"]
+    assert [c["local_handle"] for c in contributions[0]["contributors"]] == [
+        "query_count_5",
+        "test_contributor",
+    ]
+    assert [d["title"] for d in contributions[0]["dependencies"]] == [
+        "Test Contribution"
+    ]
+
+
+def test_read_contributor_reviewed_contributions_pages(
+    client, db, count_queries, add_contribution
+):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks, ReviewCreate
+
+    contribution, contributor_1, contributor_2 = add_contribution
+    contributor_1_id = contributor_1.id
+    for i in range(5):
+        reviewed, _ = crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=f"Reviewed {i}",
+                date=datetime(2022, 1, 1 + i, 0, 0, 0),
+                links=[ContributionLinks(description="Link", url="https://a.b")],
+                description="Reviewed",
+                contributors=[contributor_2.id, contributor_1.id],
+                tags=[],
+                dependencies=[contribution.id],
+            ),
+        )
+        # reviewed twice, listed once
+        for _ in range(2):
+            crud.create_review(
+                session=db,
+                review_in=ReviewCreate(
+                    contribution_id=reviewed.id, reviewers=[contributor_1_id]
+                ),
+            )
+
+    url = f"/contributors/{contributor_1_id}/reviewed_contributions"
+    with count_queries() as queries:
+        response = client.get(f"{url}?limit=3&cursor=")
+    assert response.status_code == 200
+    # contributor, page, then contributors, tags, reviews and dependencies
+    assert len(queries) == 6
+    content = response.json()["reviewed_contributions"]
+    assert [c["title"] for c in content] == ["Reviewed 0", "Reviewed 1", "Reviewed 2"]
+    assert [c["local_handle"] for c in content[0]["contributors"]] == [
+        "test_contributor2",
+        "test_contributor",
+    ]
+    assert len(content[0]["reviews"]) == 2
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(url, params={"limit": 3, "cursor": cursor})
+    content = response.json()["reviewed_contributions"]
+    assert [c["title"] for c in content] == ["Reviewed 3", "Reviewed 4"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(f"{url}?skip=4")
+    content = response.json()["reviewed_contributions"]
+    assert [c["title"] for c in content] == ["Reviewed 4"]
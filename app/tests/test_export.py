@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+
+def test_export_contributions(client, monkeypatch, add_review):
+    from app.api.routes import export
+
+    review, contribution_1, contribution_2, contributor_1, _ = add_review
+    # stream one row per batch
+    monkeypatch.setattr(export, "_BATCH_SIZE", 1)
+
+    response = client.get("/export/contributions")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        client.get(f"/contributions/{contribution.id}").json()
+        for contribution in (contribution_1, contribution_2)
+    ]
+
+    response = client.get("/export/contributions?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [contribution_1.id, contribution_2.id]
+    assert json.loads(rows[1]["dependencies"])[0]["id"] == contribution_1.id
+
+
+def test_export_contributors_reviews_and_tags(client, add_review, add_tag):
+    review, _, contribution_2, contributor_1, contributor_2 = add_review
+
+    response = client.get("/export/contributors")
+    assert [json.loads(line)["local_handle"] for line in response.iter_lines()] == [
+        contributor_1.local_handle,
+        contributor_2.local_handle,
+    ]
+
+    response = client.get("/export/reviews")
+    [row] = [json.loads(line) for line in response.iter_lines()]
+    assert row["contribution_id"] == contribution_2.id
+    assert [reviewer["id"] for reviewer in row["reviewers"]] == [contributor_1.id]
+
+    response = client.get("/export/tags?format=csv")
+    [row] = csv.DictReader(io.StringIO(response.text))
+    assert row["id"] == str(add_tag.id)
+    assert row["display_name"] == add_tag.display_name
+
+    response = client.get("/export/tags?format=xml")
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+def test_read_graph(client, count_queries, add_contribution_with_dependency, add_tag):
+    contribution_1, contribution_2, contributor_1, _ = add_contribution_with_dependency
+
+    response = client.get("/graph")
+    assert response.status_code == 200, response.json()
+    assert response.json() == {
+        "nodes": [
+            {
+                "id": contribution.id,
+                "short_title": contribution.short_title,
+                "date": "2021-01-01T00:00:00",
+                "tag_ids": [],
+            }
+            for contribution in sorted(
+                [contribution_1, contribution_2], key=lambda c: c.id
+            )
+        ],
+        "edges": [
+            {"dependency_id": contribution_1.id, "dependent_id": contribution_2.id}
+        ],
+    }
+
+    # served from the cache
+    with count_queries() as queries:
+        cached_response = client.get("/graph")
+    assert cached_response.json() == response.json()
+    assert queries == []
+
+    # updating a contribution invalidates the cache
+    response = client.put(
+        f"/contributions/{contribution_1.id}",
+        json={
+            "title": "Updated Contribution",
+            "date": "2021-01-01 00:00:00",
+            "links": [],
+            "description": "Updated Description",
+            "contributors": [contributor_1.id],
+            "tags": [add_tag.id],
+            "dependencies": [],
+        },
+    )
+    assert response.status_code == 200, response.json()
+    response = client.get("/graph")
+    nodes = {node["id"]: node for node in response.json()["nodes"]}
+    assert nodes[contribution_1.id]["tag_ids"] == [add_tag.id]
+    assert nodes[contribution_1.id]["short_title"] is None
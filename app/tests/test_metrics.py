@@ -0,0 +1,37 @@
+from sqlalchemy.pool import NullPool
+
+
+def test_read_pool_metrics(client, add_tag):
+    from app.core.config import settings
+
+    name = "async" if settings.DATABASE_ASYNC else "sync"
+    before = {pool["name"]: pool for pool in client.get("/metrics/pool").json()}
+
+    response = client.get(f"/tags/{add_tag.id}")
+    assert response.status_code == 200
+
+    response = client.get("/metrics/pool")
+    assert response.status_code == 200
+    pools = {pool["name"]: pool for pool in response.json()}
+    assert set(pools) == {"sync", "async"}
+
+    pool = pools[name]
+    assert pool["pool"].endswith("QueuePool")
+    assert pool["size"] == settings.DATABASE_POOL_SIZE
+    assert pool["checked_out"] >= 0
+    assert pool["wait_count"] == before[name]["wait_count"] + 1
+    counts = [bucket["count"] for bucket in pool["wait_buckets"]]
+    assert counts == sorted(counts)
+    assert counts[-1] <= pool["wait_count"]
+
+
+def test_engine_options_for_pgbouncer(monkeypatch):
+    from app.core.config import settings
+    from app.core.db import engine_options
+
+    assert engine_options()["pool_size"] == settings.DATABASE_POOL_SIZE
+
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER", True)
+    assert engine_options() == dict(
+        poolclass=NullPool, connect_args={"prepare_threshold": None}
+    )
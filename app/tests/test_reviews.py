@@ -156,3 +156,28 @@ def test_read_contribution_with_review(
             }
         ],
     }
+
+
+def test_read_review_etag(client, add_review):
+    review, contribution_1, contribution_2, contributor_1, contributor_2 = add_review
+
+    response = client.get(f"/reviews/{review.id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    response = client.get(f"/reviews/{review.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # changing the reviewers only touches link rows
+    response = client.put(
+        f"/reviews/{review.id}",
+        json={
+            "contribution_id": contribution_2.id,
+            "reviewers": [contributor_1.id, contributor_2.id],
+            "notes": review.notes,
+            "link": review.link,
+        },
+    )
+    assert response.status_code == 200, response.json()
+    response = client.get(f"/reviews/{review.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["reviewers"]) == 2
@@ -18,6 +18,7 @@ def test_create_tag(client):
     assert content == {
         "display_name": "Test Tag",
         "color": "#FF0000",
+        "contribution_count": 0,
     }
 
     # verify that the tag was created in the database
@@ -29,6 +30,7 @@ def test_create_tag(client):
         "color": "#FF0000",
         "created_at": created_at,
         "updated_at": updated_at,
+        "contribution_count": 0,
         "contributions": [],
     }
 
@@ -48,6 +50,7 @@ def test_create_tag(client):
         "display_name": "Updated Tag",
         "color": "#00FF00",
         "created_at": created_at,
+        "contribution_count": 0,
     }
     assert datetime.fromisoformat(new_updated_at) > datetime.fromisoformat(updated_at)
 
@@ -60,6 +63,7 @@ def test_create_tag(client):
         "color": "#00FF00",
         "created_at": created_at,
         "updated_at": new_updated_at,
+        "contribution_count": 0,
         "contributions": [],
     }
 
@@ -79,6 +83,7 @@ def test_read_tag_with_contributions(client, add_contribution_with_tag):
         "id": tag.id,
         "display_name": tag.display_name,
         "color": tag.color,
+        "contribution_count": 1,
         "contributions": [
             {
                 "id": contribution.id,
@@ -111,3 +116,108 @@ def test_read_tag_with_contributions(client, add_contribution_with_tag):
             }
         ],
     }
+
+
+def test_read_tags_with_cursor(client):
+    tag_ids = []
+    for i in range(3):
+        response = client.post(
+            "/tags/", json={"display_name": f"Cursor Tag {i}", "color": "#FF0000"}
+        )
+        assert response.status_code == 200, response.json()
+        tag_ids.append(response.json()["id"])
+
+    response = client.get("/tags/", params={"limit": 2, "cursor": ""})
+    assert response.status_code == 200
+    assert [tag["id"] for tag in response.json()] == tag_ids[:2]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get("/tags/", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 200
+    assert [tag["id"] for tag in response.json()] == tag_ids[2:]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_read_tags_cached(client, count_queries, add_tag):
+    response = client.get("/tags/")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    stats = client.get("/metrics/cache").json()
+
+    # served from the cache, with the same headers
+    with count_queries() as queries:
+        cached = client.get("/tags/")
+        not_modified = client.get("/tags/", headers={"If-None-Match": etag})
+        weak = client.get("/tags/", headers={"If-None-Match": f'"x", W/{etag}'})
+        star = client.get("/tags/", headers={"If-None-Match": "*"})
+        # the unquoted tag is a different entity tag
+        modified = client.get("/tags/", headers={"If-None-Match": etag.strip('"')})
+    assert queries == []
+    assert cached.json() == response.json()
+    assert cached.headers["ETag"] == etag
+    assert not_modified.status_code == 304
+    assert weak.status_code == 304
+    assert star.status_code == 304
+    assert modified.status_code == 200
+    assert client.get("/metrics/cache").json()["hits"] == stats["hits"] + 5
+
+    # writes invalidate the cached responses
+    response = client.put(
+        f"/tags/{add_tag.id}", json={"display_name": "Renamed", "color": "#000000"}
+    )
+    assert response.status_code == 200
+    response = client.get("/tags/")
+    assert response.json()[0]["display_name"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+
+def test_read_tag_contribution_pages(
+    client, db, count_queries, add_contribution_with_tag
+):
+    from app import crud
+    from app.models import ContributionCreate, ContributionLinks
+
+    tag, contribution, contributor = add_contribution_with_tag
+    tag_id, contributor_id = tag.id, contributor.id
+    for i in range(4):
+        crud.create_contribution(
+            session=db,
+            contribution=ContributionCreate(
+                title=f"Tagged {i}",
+                date=datetime(2022, 1, 1 + i, 0, 0, 0),
+                links=[ContributionLinks(description="Link", url="https://a.b")],
+                description="Tagged",
+                contributors=[contributor_id],
+                tags=[tag_id],
+                dependencies=[contribution.id],
+            ),
+        )
+
+    with count_queries() as queries:
+        response = client.get(f"/tags/{tag_id}", params={"limit": 3, "cursor": ""})
+    assert response.status_code == 200
+    # version, tag, page with its contributors, tags, reviews and
+    # dependencies, and the count
+    assert len(queries) == 8
+    content = response.json()
+    assert content["contribution_count"] == 5
+    assert [c["title"] for c in content["contributions"]] == [
+        "Test Contribution",
+        "Tagged 0",
+        "Tagged 1",
+    ]
+    assert [c["id"] for c in content["contributions"][1]["contributors"]] == [
+        contributor_id
+    ]
+    assert [d["title"] for d in content["contributions"][1]["dependencies"]] == [
+        "Test Contribution"
+    ]
+
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/tags/{tag_id}", params={"limit": 3, "cursor": cursor})
+    content = response.json()
+    assert [c["title"] for c in content["contributions"]] == ["Tagged 2", "Tagged 3"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/tags/")
+    assert [t["contribution_count"] for t in response.json()] == [5]
@@ -0,0 +1,115 @@
+"""Compare the sync and async database paths of the API under concurrent load.
+
+Starts the app twice with uvicorn, with DATABASE_ASYNC off then on and the
+response cache disabled so that every request reaches the database, and
+fires the same concurrent GET requests at both. The database settings are
+read from the environment, as for the app itself.
+
+    python benchmarks/async_session.py --path "/contributions?limit=20"
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+async def wait_until_ready(client: httpx.AsyncClient, path: str) -> None:
+    for _ in range(100):
+        try:
+            response = await client.get(path)
+            response.raise_for_status()
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("The app did not start")
+
+
+async def run_load(
+    base_url: str, path: str, requests: int, concurrency: int
+) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(path)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await wait_until_ready(client, path)
+
+        async def worker() -> None:
+            while not queue.empty():
+                url = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies
+
+
+def benchmark(database_async: bool, args: argparse.Namespace) -> None:
+    env = dict(
+        os.environ, DATABASE_ASYNC=str(database_async), RESPONSE_CACHE_BACKEND="none"
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        elapsed, latencies = asyncio.run(
+            run_load(
+                f"http://127.0.0.1:{args.port}",
+                args.path,
+                args.requests,
+                args.concurrency,
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{'async' if database_async else 'sync':>5}: "
+        f"{len(latencies) / elapsed:8.1f} req/s, "
+        f"p50 {quantiles[49] * 1000:7.1f} ms, "
+        f"p95 {quantiles[94] * 1000:7.1f} ms, "
+        f"p99 {quantiles[98] * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/contributions?limit=20")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(
+        f"GET {args.path}: {args.requests} requests, "
+        f"{args.concurrency} concurrent clients"
+    )
+    for database_async in (False, True):
+        benchmark(database_async, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare FastAPI's default response rendering with PydanticJSONResponse.
+
+Renders a page of contributions, already validated as the routes do, both
+ways: validated again against the response model then encoded by
+JSONResponse, and dumped straight to bytes by pydantic-core. Runs without a
+database, although importing the app reads the database settings.
+
+    python -m benchmarks.serialization --items 100
+"""
+import argparse
+import asyncio
+import timeit
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import crud  # noqa: F401, imports the models
+from app.api.responses import PydanticJSONResponse
+from app.models import (
+    ContributionShort,
+    ContributionWithAttributesShortPublic,
+    ContributorShort,
+    ReviewPublic,
+    TagShort,
+)
+
+
+def contributions_page(items: int) -> list[ContributionWithAttributesShortPublic]:
+    now = datetime.now(timezone.utc)
+    contributors = [
+        ContributorShort(id=i, local_handle=f"handle_{i}", display_name=f"Name {i}")
+        for i in range(3)
+    ]
+    tags = [
+        TagShort(
+            id=i,
+            display_name=f"Tag {i}",
+            color="#ffffff",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(2)
+    ]
+    dependencies = [
+        ContributionShort(
+            id=f"dep{i:05d}",
+            title=f"Dependency {i}",
+            date=now,
+            contributors=contributors[:1],
+            tags=tags[:1],
+        )
+        for i in range(2)
+    ]
+    return [
+        ContributionWithAttributesShortPublic(
+            id=f"c{i:07d}",
+            title=f"Contribution {i}",
+            short_title=f"C{i}",
+            date=now,
+            description="A description of the contribution. " * 8,
+            links=[{"url": "https://example.com/", "description": "Example"}],
+            created_at=now,
+            updated_at=now,
+            github_link="https://github.com/example/example",
+            contributors=contributors,
+            tags=tags,
+            reviews=[
+                ReviewPublic(
+                    id=i,
+                    notes="Looks good",
+                    created_at=now,
+                    updated_at=now,
+                    contribution_id=f"c{i:07d}",
+                    reviewers=contributors[:1],
+                )
+            ],
+            dependencies=dependencies,
+        )
+        for i in range(items)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    page = contributions_page(args.items)
+    field = create_response_field(
+        name="Response", type_=list[ContributionWithAttributesShortPublic]
+    )
+
+    loop = asyncio.new_event_loop()
+
+    def fastapi_default() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=page)
+        )
+        return JSONResponse(content).body
+
+    def pydantic_json() -> bytes:
+        return PydanticJSONResponse(page).body
+
+    print(f"{args.items} contributions, best of 5 x {args.repeat} renders")
+    timings = {}
+    for name, render in (
+        ("FastAPI default", fastapi_default),
+        ("PydanticJSONResponse", pydantic_json),
+    ):
+        timings[name] = min(timeit.repeat(render, number=args.repeat, repeat=5))
+        per_render = timings[name] / args.repeat * 1000
+        print(f"{name:>20}: {per_render:7.3f} ms per page")
+    speedup = timings["FastAPI default"] / timings["PydanticJSONResponse"]
+    print(f"{'speedup':>20}: {speedup:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()